@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .models import (
+    AuthorStats, Category, Comment, Follow, Location, Post
+)
 
 
 admin.site.empty_value_display = 'Не задано'
@@ -20,3 +22,16 @@ class PostAdmin(admin.ModelAdmin):
 admin.site.register(Category)
 admin.site.register(Location)
 admin.site.register(Comment)
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ('author', 'post_count', 'published_post_count',
+                    'comments_received', 'comments_written', 'last_post_date')
+    readonly_fields = list_display
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('user', 'author', 'created_at')
+    raw_id_fields = ('user', 'author')
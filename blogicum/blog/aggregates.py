@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+from .constants import AGGREGATES_CACHE_TIMEOUT
+from .models import Category, Post, published_posts_filter
+
+
+CATEGORY_COUNTS_CACHE_KEY = 'blog:category_counts'
+ARCHIVE_MONTHS_CACHE_KEY = 'blog:archive_months'
+
+
+def get_category_counts():
+    categories = cache.get(CATEGORY_COUNTS_CACHE_KEY)
+    if categories is None:
+        categories = list(
+            Category.objects.filter(is_published=True).annotate(
+                post_count=Count(
+                    'posts', filter=published_posts_filter('posts__')
+                )
+            ).order_by('title')
+        )
+        cache.set(
+            CATEGORY_COUNTS_CACHE_KEY, categories, AGGREGATES_CACHE_TIMEOUT
+        )
+    return categories
+
+
+def get_archive_months():
+    months = cache.get(ARCHIVE_MONTHS_CACHE_KEY)
+    if months is None:
+        months = list(
+            Post.objects.filter(published_posts_filter()).annotate(
+                month=TruncMonth('pub_date')
+            ).values('month').annotate(
+                post_count=Count('id')
+            ).order_by('-month')
+        )
+        cache.set(ARCHIVE_MONTHS_CACHE_KEY, months, AGGREGATES_CACHE_TIMEOUT)
+    return months
+
+
+def invalidate():
+    cache.delete_many([CATEGORY_COUNTS_CACHE_KEY, ARCHIVE_MONTHS_CACHE_KEY])
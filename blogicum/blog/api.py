@@ -0,0 +1,270 @@
+"""JSON API для мобильного клиента.
+
+Состав полей задаётся параметром ``?fields=``; только эти колонки и
+связи попадают в ``values_list()``, а строки сериализуются без создания
+экземпляров моделей. Пагинация курсорная: курсор кодирует (дата, id)
+последней выданной записи.
+"""
+import asyncio
+from functools import wraps
+
+from django.db.models import Count, Q
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+)
+from django.middleware.csrf import get_token
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from . import events
+from .constants import (
+    API_PAGE_SIZE_MAX, EXPORT_CHUNK_SIZE, POSTS_QUANTITY, SSE_KEEPALIVE
+)
+from .models import Category, Comment, Post, published_posts_filter
+from .serializers import (
+    CATEGORY_FIELDS, COMMENT_FIELDS, POST_FIELDS, dumps, get_rows,
+    stream_array, to_dicts
+)
+from .utils import decode_cursor, encode_cursor
+
+POST_DEFAULT_FIELDS = ('id', 'title', 'pub_date', 'author', 'category')
+COMMENT_DEFAULT_FIELDS = tuple(COMMENT_FIELDS)
+CATEGORY_DEFAULT_FIELDS = ('id', 'title', 'slug')
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class ApiError(ValueError):
+    pass
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        dumps(data), content_type=JSON_CONTENT_TYPE, status=status
+    )
+
+
+def api_view(view):
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            data = view(request, *args, **kwargs)
+        except ApiError as error:
+            return json_response({'error': str(error)}, status=400)
+        except Http404:
+            return json_response({'error': 'Не найдено.'}, status=404)
+        response = json_response(data)
+        set_response_etag(response)
+        return get_conditional_response(
+            request, etag=response['ETag'], response=response
+        )
+    return wrapper
+
+
+def parse_fields(request, available, default):
+    if not request.GET.get('fields'):
+        return default
+    fields = tuple(dict.fromkeys(request.GET['fields'].split(',')))
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}.')
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', POSTS_QUANTITY))
+    except ValueError:
+        raise ApiError('limit должен быть числом.')
+    return max(1, min(limit, API_PAGE_SIZE_MAX))
+
+
+def parse_cursor(request):
+    try:
+        return decode_cursor(request.GET['cursor'])
+    except ValueError:
+        raise ApiError('Некорректный курсор.')
+
+
+def after_cursor(queryset, date_field, cursor, descending=False):
+    moment, pk = cursor
+    lookup = 'lt' if descending else 'gt'
+    return queryset.filter(
+        Q(**{f'{date_field}__{lookup}': moment})
+        | Q(**{date_field: moment, f'id__{lookup}': pk})
+    )
+
+
+def cursor_page(queryset, request, available, fields, date_field,
+                descending=True):
+    limit = parse_limit(request)
+    if request.GET.get('cursor'):
+        queryset = after_cursor(
+            queryset, date_field, parse_cursor(request), descending
+        )
+    prefix = '-' if descending else ''
+    rows = list(
+        get_rows(
+            queryset, available, fields, date_field, 'id'
+        ).order_by(f'{prefix}{date_field}', f'{prefix}id')[:limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*rows[-1][-2:])
+    return {
+        'results': list(to_dicts((row[:-2] for row in rows), fields)),
+        'next': next_cursor,
+    }
+
+
+def get_post_queryset(fields):
+    if 'comment_count' in fields:
+        return Post.objects.annotate(comment_count=Count('comments'))
+    return Post.objects.all()
+
+
+def get_visible_post(request, post_id, posts=Post.objects):
+    return get_object_or_404(
+        posts.filter(Q(author_id=request.user.id) | published_posts_filter()),
+        id=post_id,
+    )
+
+
+@api_view
+def post_list(request):
+    fields = parse_fields(request, POST_FIELDS, POST_DEFAULT_FIELDS)
+    posts = get_post_queryset(fields).filter(published_posts_filter())
+    if request.GET.get('category'):
+        posts = posts.filter(category__slug=request.GET['category'])
+    return cursor_page(posts, request, POST_FIELDS, fields, 'pub_date')
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = parse_fields(request, POST_FIELDS, tuple(POST_FIELDS))
+    row = get_visible_post(
+        request, post_id,
+        get_rows(get_post_queryset(fields), POST_FIELDS, fields),
+    )
+    return next(to_dicts([row], fields))
+
+
+@api_view
+def comment_list(request, post_id):
+    fields = parse_fields(request, COMMENT_FIELDS, COMMENT_DEFAULT_FIELDS)
+    post = get_visible_post(request, post_id, Post.objects.only('id'))
+    return cursor_page(
+        Comment.objects.filter(post=post), request, COMMENT_FIELDS, fields,
+        'created_at', descending=False,
+    )
+
+
+@api_view
+def comment_updates(request, post_id):
+    post = get_visible_post(request, post_id, Post.objects.only('id'))
+    comments = post.comments.select_related('author')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        comments = after_cursor(comments, 'created_at', parse_cursor(request))
+    comments = list(comments.order_by('created_at', 'id')[:API_PAGE_SIZE_MAX])
+    if comments:
+        cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+    return {
+        'count': len(comments),
+        'cursor': cursor,
+        'html': render_to_string(
+            'includes/comments.html',
+            {'post': post, 'comments': comments, 'comments_only': True},
+            request,
+        ).strip(),
+    }
+
+
+@api_view
+def category_list(request):
+    fields = parse_fields(request, CATEGORY_FIELDS, CATEGORY_DEFAULT_FIELDS)
+    return cursor_page(
+        Category.objects.filter(is_published=True), request,
+        CATEGORY_FIELDS, fields, 'created_at', descending=False,
+    )
+
+
+@require_safe
+@never_cache
+def csrf_token(request):
+    return json_response({'token': get_token(request)})
+
+
+@require_safe
+def export_posts(request):
+    try:
+        fields = parse_fields(request, POST_FIELDS, tuple(POST_FIELDS))
+    except ApiError as error:
+        return json_response({'error': str(error)}, status=400)
+    rows = get_rows(
+        get_post_queryset(fields).filter(published_posts_filter()),
+        POST_FIELDS, fields,
+    ).order_by('-pub_date', '-id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return StreamingHttpResponse(
+        stream_array(to_dicts(rows, fields), EXPORT_CHUNK_SIZE),
+        content_type=JSON_CONTENT_TYPE,
+    )
+
+
+async def stream_comments(post_id, cursor, broker=None):
+    broker = broker or events.get_broker()
+    subscription = broker.subscribe(events.get_channel(post_id))
+    try:
+        # Брокер с опросом БД может прислать и то, что уже есть на странице.
+        last_id = cursor[1] if cursor else 0
+        if cursor:
+            missed = after_cursor(
+                Comment.objects.filter(post_id=post_id).select_related(
+                    'post', 'author'
+                ),
+                'created_at', cursor,
+            ).order_by('created_at', 'id')[:API_PAGE_SIZE_MAX]
+            async for comment in missed:
+                last_id = comment.id
+                yield events.format_event(comment)
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(), SSE_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            if message['id'] > last_id:
+                yield message['event']
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def comment_stream(request, post_id):
+    """Поток новых комментариев (text/event-stream); рассчитан на ASGI.
+
+    После переподключения браузер присылает Last-Event-ID, и пропущенные
+    комментарии дочитываются из БД перед переходом к живым событиям.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await request.auser()
+    if not await Post.objects.filter(
+        Q(author_id=user.id) | published_posts_filter(), id=post_id
+    ).aexists():
+        return json_response({'error': 'Не найдено.'}, status=404)
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+    try:
+        cursor = cursor and decode_cursor(cursor)
+    except ValueError:
+        return json_response({'error': 'Некорректный курсор.'}, status=400)
+    return StreamingHttpResponse(
+        stream_comments(post_id, cursor),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+from .constants import USER_CACHE_TIMEOUT
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def get_user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
+
+
+def check_shared_cache():
+    # Выход из системы, смена пароля и блокировка инвалидируют кеш только
+    # в своём процессе, поэтому locmem здесь отдаёт устаревшие данные.
+    # Индекс несброшенных комментариев чистит отдельный процесс
+    # flush_comments, и его тоже должны видеть все воркеры.
+    aliases = {}
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES:
+        aliases[settings.SESSION_CACHE_ALIAS] = 'SESSION_ENGINE'
+    if f'{__name__}.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS:
+        aliases[DEFAULT_CACHE_ALIAS] = 'AUTHENTICATION_BACKENDS'
+    if settings.COMMENT_BUFFER_ENABLED:
+        aliases[DEFAULT_CACHE_ALIAS] = 'COMMENT_BUFFER_ENABLED'
+    for alias, setting in aliases.items():
+        if isinstance(caches[alias], LocMemCache):
+            raise ImproperlyConfigured(
+                f'{setting} требует общего для всех процессов кеша, '
+                f'а кеш «{alias}» — LocMemCache.'
+            )
@@ -0,0 +1,223 @@
+"""Write-behind буфер комментариев.
+
+Комментарии дописываются в локальный журнал (одна JSON-строка на запись),
+а команда ``flush_comments`` периодически переносит их в БД через
+``bulk_create``. Каждая запись несёт ``id``, который сохраняется в
+``Comment.buffer_id``: повторный сброс того же журнала после аварии не
+создаёт дублей. Несброшенные записи автора индексируются в кеше по паре
+(пост, автор), чтобы страница поста не перечитывала весь журнал.
+"""
+import fcntl
+import json
+import os
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import events, stats
+from .constants import (
+    COMMENT_BUFFER_BATCH_SIZE, COMMENT_BUFFER_PENDING_TIMEOUT
+)
+from .models import Comment, Post, published_posts_filter
+from .utils import batched
+
+
+User = get_user_model()
+
+
+def is_enabled():
+    return settings.COMMENT_BUFFER_ENABLED
+
+
+def get_log_path():
+    return Path(settings.COMMENT_BUFFER_PATH)
+
+
+def get_flushing_path():
+    path = get_log_path()
+    return path.with_name(path.name + '.flushing')
+
+
+def get_pending_key(post_id, author_id):
+    return f'blog:pending_comments:{post_id}:{author_id}'
+
+
+def is_current(fd, path):
+    try:
+        return os.fstat(fd).st_ino == os.stat(path).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def write_line(path, line):
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            # Пока ждали блокировку, flush мог переименовать журнал:
+            # тогда пишем в новый файл.
+            if is_current(fd, path):
+                os.write(fd, line)
+                os.fsync(fd)
+                return
+        finally:
+            os.close(fd)
+
+
+def wait_for_writers(path):
+    # Писатели, открывшие журнал до переименования, держат разделяемую
+    # блокировку; после эксклюзивной новых записей в файл не будет.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    finally:
+        os.close(fd)
+
+
+def append(post_id, author_id, text):
+    record = {
+        'id': uuid4().hex,
+        'post': post_id,
+        'author': author_id,
+        'text': text,
+        'created_at': timezone.now().isoformat(),
+    }
+    write_line(
+        get_log_path(),
+        (json.dumps(record, ensure_ascii=False) + '\n').encode(),
+    )
+    key = get_pending_key(post_id, author_id)
+    cache.set(
+        key, cache.get(key, []) + [record], COMMENT_BUFFER_PENDING_TIMEOUT
+    )
+
+
+def read_records(path):
+    try:
+        with open(path, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Недописанная строка после аварийной остановки.
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def get_flushed_ids(records):
+    ids = [record['id'] for record in records if 'id' in record]
+    return {
+        buffer_id.hex
+        for batch in batched(ids, COMMENT_BUFFER_BATCH_SIZE)
+        for buffer_id in Comment.objects.filter(
+            buffer_id__in=batch
+        ).values_list('buffer_id', flat=True)
+    }
+
+
+def pending_for(post_id, user):
+    if not is_enabled() or not user.is_authenticated:
+        return []
+    records = cache.get(get_pending_key(post_id, user.id), [])
+    if not records:
+        return []
+    # Индекс чистится при сбросе, но сверка с БД не даёт показать
+    # уже сохранённый комментарий дважды.
+    flushed = get_flushed_ids(records)
+    return [
+        Comment(
+            post_id=post_id,
+            author=user,
+            text=record['text'],
+            created_at=parse_datetime(record['created_at']),
+        )
+        for record in records
+        if record['id'] not in flushed
+    ]
+
+
+def forget_pending(records):
+    flushed = {}
+    for record in records:
+        flushed.setdefault(
+            get_pending_key(record['post'], record['author']), set()
+        ).add(record.get('id'))
+    for key, pending in cache.get_many(flushed).items():
+        rest = [
+            record for record in pending if record['id'] not in flushed[key]
+        ]
+        if rest:
+            cache.set(key, rest, COMMENT_BUFFER_PENDING_TIMEOUT)
+        else:
+            cache.delete(key)
+
+
+def flush(batch_size=COMMENT_BUFFER_BATCH_SIZE):
+    flushing_path = get_flushing_path()
+    if not flushing_path.exists():
+        try:
+            os.replace(get_log_path(), flushing_path)
+        except FileNotFoundError:
+            return []
+    wait_for_writers(flushing_path)
+    records = list(read_records(flushing_path))
+    flushed = get_flushed_ids(records)
+    # Пост мог быть скрыт после отправки: чужие комментарии к нему
+    # отбрасываются, автор может комментировать свой пост всегда.
+    post_authors = dict(Post.objects.filter(
+        id__in={record['post'] for record in records}
+    ).values_list('id', 'author_id'))
+    published_ids = set(Post.objects.filter(
+        published_posts_filter(), id__in=post_authors
+    ).values_list('id', flat=True))
+    author_ids = set(User.objects.filter(
+        id__in={record['author'] for record in records}
+    ).values_list('id', flat=True))
+    accepted = [
+        record for record in records
+        if record['post'] in post_authors
+        and record['author'] in author_ids
+        and (
+            record['post'] in published_ids
+            or post_authors[record['post']] == record['author']
+        )
+        and record.get('id') not in flushed
+    ]
+    with transaction.atomic():
+        comments = Comment.objects.bulk_create(
+            [
+                Comment(
+                    post_id=record['post'],
+                    author_id=record['author'],
+                    text=record['text'],
+                    buffer_id=record.get('id'),
+                )
+                for record in accepted
+            ],
+            batch_size=batch_size,
+        )
+        # auto_now_add проставил время сброса: возвращаем время отправки,
+        # иначе порядок (created_at, id) сдвигается на интервал сброса.
+        for comment, record in zip(comments, accepted):
+            comment.created_at = parse_datetime(record['created_at'])
+        Comment.objects.bulk_update(
+            comments, ['created_at'], batch_size=batch_size
+        )
+        stats.count_comments(comments)
+        # bulk_create не отправляет post_save, поэтому публикуем сами.
+        events.publish_comments(Comment.objects.filter(
+            id__in=[comment.id for comment in comments]
+        ).select_related('post', 'author'))
+    flushing_path.unlink()
+    forget_pending(records)
+    return comments
@@ -1,3 +1,28 @@
 POSTS_QUANTITY = 10
 CATEGORY_TITLE_LENGTH = 15
 COMMENT_PREVIEW_LENGTH = 50
+COMMENT_BUFFER_BATCH_SIZE = 500
+COMMENT_BUFFER_PENDING_TIMEOUT = 60 * 60
+USER_CACHE_TIMEOUT = 60 * 15
+MEDIA_GC_BATCH_SIZE = 1000
+STATS_BATCH_SIZE = 1000
+TRENDING_BATCH_SIZE = 1000
+TRENDING_COMMENT_WEIGHT = 5
+TRENDING_VIEW_WEIGHT = 1
+VIEW_COUNTER_BATCH_SIZE = 500
+AGGREGATES_CACHE_TIMEOUT = 60 * 5
+SCHEDULER_BATCH_SIZE = 500
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_MAX_ENTRIES = 500
+TIMELINE_BACKFILL = 20
+TIMELINE_BATCH_SIZE = 1000
+TIMELINE_PULL_AUTHORS_TIMEOUT = 60 * 5
+API_PAGE_SIZE_MAX = 100
+EXPORT_CHUNK_SIZE = 2000
+SSE_KEEPALIVE = 15
+SSE_QUEUE_SIZE = 100
+SSE_POLL_INTERVAL = 1
+SSE_POLL_GRACE = 5
+MISSING_CACHE_SIZE = 10000
+MISSING_CACHE_TTL = 60
+COMMENT_SUBMISSION_TIMEOUT = 60 * 60
@@ -0,0 +1,9 @@
+from django.conf import settings
+
+from .aggregates import get_category_counts
+
+
+def category_sidebar(request):
+    if not settings.CATEGORY_SIDEBAR:
+        return {}
+    return {'sidebar_categories': get_category_counts}
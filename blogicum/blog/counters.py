@@ -0,0 +1,110 @@
+"""Счётчики просмотров в памяти процесса с пакетной записью в БД.
+
+Каждый процесс копит просмотры у себя и сбрасывает их не реже, чем раз
+в VIEW_COUNTER_FLUSH_INTERVAL секунд (или при накоплении
+VIEW_COUNTER_MAX_PENDING публикаций) и при штатной остановке, поэтому
+при аварийном перезапуске теряется не больше одного интервала.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from . import trending
+from .constants import VIEW_COUNTER_BATCH_SIZE
+from .models import Post, PostViewCount
+from .utils import batched
+
+
+logger = logging.getLogger(__name__)
+
+
+@transaction.atomic
+def save_views(view_counts):
+    post_ids = list(Post.objects.filter(
+        id__in=view_counts
+    ).values_list('id', flat=True))
+    for batch in batched(post_ids, VIEW_COUNTER_BATCH_SIZE):
+        PostViewCount.objects.bulk_create(
+            [PostViewCount(post_id=post_id) for post_id in batch],
+            ignore_conflicts=True,
+        )
+        PostViewCount.objects.filter(post_id__in=batch).update(views=Case(
+            *[
+                When(post_id=post_id, then=F('views') + view_counts[post_id])
+                for post_id in batch
+            ]
+        ))
+    trending.add_views(
+        {post_id: view_counts[post_id] for post_id in post_ids},
+        timezone.now(),
+    )
+
+
+class ViewCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.pending_since = None
+
+    def record(self, post_id):
+        with self.lock:
+            self.pending[post_id] += 1
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+            due = (
+                time.monotonic() - self.pending_since
+                >= settings.VIEW_COUNTER_FLUSH_INTERVAL
+                or len(self.pending) >= settings.VIEW_COUNTER_MAX_PENDING
+            )
+        if due:
+            try:
+                self.flush()
+            except Exception:
+                # Просмотр страницы не должен падать из-за счётчика:
+                # несохранённые просмотры остаются до следующего сброса.
+                logger.exception('Не удалось сохранить счётчики просмотров')
+
+    def get_pending(self, post_id):
+        with self.lock:
+            return self.pending[post_id]
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.pending_since = None
+        if not pending:
+            return
+        try:
+            save_views(pending)
+        except Exception:
+            with self.lock:
+                self.pending.update(pending)
+                if self.pending_since is None:
+                    self.pending_since = time.monotonic()
+            raise
+
+
+def flush_on_exit():
+    try:
+        view_counter.flush()
+    except Exception:
+        # БД при остановке уже может быть недоступна.
+        pass
+
+
+view_counter = ViewCounter()
+atexit.register(flush_on_exit)
+
+
+def get_views(post):
+    stored = (
+        post.view_count.views if hasattr(post, 'view_count') else 0
+    )
+    return stored + view_counter.get_pending(post.id)
@@ -0,0 +1,202 @@
+"""Рассылка новых комментариев открытым SSE-потокам.
+
+Брокер выбирается настройкой COMMENT_EVENTS_BROKER. ``LocalBroker``
+раздаёт события подписчикам только текущего процесса. ``DatabaseBroker``
+(по умолчанию) дополнительно опрашивает таблицу комментариев — один
+запрос на процесс, а не на читателя — и поэтому доставляет комментарии,
+сохранённые другими воркерами и командой ``flush_comments``. Другой
+межпроцессный брокер (например, на Redis pub/sub) наследует
+``LocalBroker`` и отдаёт принятые сообщения в ``LocalBroker.publish``.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from functools import cache
+
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .constants import SSE_POLL_GRACE, SSE_POLL_INTERVAL, SSE_QUEUE_SIZE
+from .models import Comment
+from .serializers import dumps
+from .utils import encode_cursor
+
+
+class Subscription:
+    __slots__ = ('channel', 'loop', 'queue')
+
+    def __init__(self, channel, maxsize=SSE_QUEUE_SIZE):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, message):
+        if self.queue.full():
+            # Отстающий читатель теряет старые события и догонит их
+            # по курсору при переподключении.
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+def deliver(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.put(message)
+
+
+class LocalBroker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def publish(self, channel, message):
+        by_loop = defaultdict(list)
+        with self.lock:
+            for subscription in self.subscriptions.get(channel, ()):
+                by_loop[subscription.loop].append(subscription)
+        # Один вызов call_soon_threadsafe на цикл событий, а не на
+        # каждого читателя.
+        for loop, subscriptions in by_loop.items():
+            loop.call_soon_threadsafe(deliver, subscriptions, message)
+        return sum(map(len, by_loop.values()))
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel)
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.channel]
+
+
+class DatabaseBroker(LocalBroker):
+    """Доставляет комментарии из БД подписчикам текущего процесса.
+
+    Пока есть подписчики, фоновая задача раз в SSE_POLL_INTERVAL секунд
+    выбирает комментарии к их постам с перекрытием SSE_POLL_GRACE секунд
+    (на поздно зафиксированные транзакции). Уже разосланные id
+    запоминаются, поэтому локальная публикация и опрос не дублируют
+    события.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.poller = None
+        self.delivered = {}
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        with self.lock:
+            if self.poller is None or self.poller.done():
+                self.poller = subscription.loop.create_task(self.poll())
+        return subscription
+
+    def publish(self, channel, message):
+        if not self.mark_delivered(message['id']):
+            return 0
+        return super().publish(channel, message)
+
+    def mark_delivered(self, comment_id):
+        now = time.monotonic()
+        with self.lock:
+            if comment_id in self.delivered:
+                return False
+            self.delivered[comment_id] = now
+            return True
+
+    def forget_delivered(self):
+        expired = time.monotonic() - 2 * (SSE_POLL_GRACE + SSE_POLL_INTERVAL)
+        with self.lock:
+            self.delivered = {
+                comment_id: moment
+                for comment_id, moment in self.delivered.items()
+                if moment > expired
+            }
+
+    async def poll(self):
+        since = timezone.now() - timedelta(seconds=SSE_POLL_GRACE)
+        while True:
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            with self.lock:
+                if not self.subscriptions:
+                    self.poller = None
+                    return
+                post_ids = list(map(get_post_id, self.subscriptions))
+            started = timezone.now()
+            comments = Comment.objects.filter(
+                post_id__in=post_ids, created_at__gte=since
+            ).select_related('post', 'author').order_by('created_at', 'id')
+            async for comment in comments:
+                if comment.id in self.delivered:
+                    continue
+                self.publish(get_channel(comment.post_id), {
+                    'id': comment.id, 'event': format_event(comment)
+                })
+            since = started - timedelta(seconds=SSE_POLL_GRACE)
+            self.forget_delivered()
+
+
+@cache
+def get_broker():
+    return import_string(settings.COMMENT_EVENTS_BROKER)()
+
+
+def is_enabled():
+    return settings.COMMENT_EVENTS_ENABLED
+
+
+def get_channel(post_id):
+    return f'post:{post_id}:comments'
+
+
+def get_post_id(channel):
+    return int(channel.split(':')[1])
+
+
+def format_event(comment):
+    """Готовый SSE-кадр: кодируется один раз и раздаётся всем читателям."""
+    cursor = encode_cursor(comment.created_at, comment.id)
+    data = dumps({
+        'id': comment.id,
+        'html': render_to_string('includes/comments.html', {
+            'post': comment.post,
+            'comments': [comment],
+            'comments_only': True,
+        }).strip(),
+    })
+    return f'id: {cursor}\nevent: comment\n'.encode() + b'data: ' + (
+        data + b'\n\n'
+    )
+
+
+def publish_comments(comments):
+    if not is_enabled():
+        return
+    messages = [
+        (
+            get_channel(comment.post_id),
+            {'id': comment.id, 'event': format_event(comment)},
+        )
+        for comment in comments
+    ]
+
+    def publish():
+        broker = get_broker()
+        for channel, message in messages:
+            broker.publish(channel, message)
+
+    transaction.on_commit(publish)
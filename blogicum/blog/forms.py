@@ -1,3 +1,5 @@
+from uuid import uuid4
+
 from django import forms
 from django.contrib.auth.forms import UserChangeForm
 from django.contrib.auth.models import User
@@ -14,6 +16,15 @@ class ProfileEditForm(UserChangeForm):
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
+    def clean_image(self):
+        if 'image' in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors['image'])
+        return self.cleaned_data['image']
+
     class Meta:
         model = Post
         exclude = ('author',)
@@ -23,6 +34,14 @@ class PostForm(forms.ModelForm):
 
 
 class CommentForm(forms.ModelForm):
+    idempotency_key = forms.CharField(
+        widget=forms.HiddenInput, required=False, max_length=32
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.is_bound:
+            self.initial.setdefault('idempotency_key', uuid4().hex)
 
     class Meta:
         model = Comment
@@ -0,0 +1,71 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core import serializers as django_serializers
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import serializers
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.models import Category, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает сериализацию публикаций через django.core.'
+            'serializers и через blog.serializers. Данные откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+
+    def handle(self, *args, posts, **options):
+        with transaction.atomic():
+            self.measure(posts)
+            transaction.set_rollback(True)
+
+    def measure(self, count):
+        category = Category.objects.create(
+            title='Бенчмарк', slug='benchmark-serialization'
+        )
+        author = User.objects.create(username='benchmark-serialization')
+        now = timezone.now()
+        Post.objects.bulk_create(
+            (
+                Post(title=f'Пост {i}', text='Текст публикации ' * 20,
+                     author=author, category=category, pub_date=now)
+                for i in range(count)
+            ),
+            batch_size=EXPORT_CHUNK_SIZE,
+        )
+        posts = Post.objects.filter(category=category)
+
+        started = time.perf_counter()
+        django_size = len(django_serializers.serialize(
+            'json', posts.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        ).encode())
+        django_time = time.perf_counter() - started
+
+        fields = tuple(
+            field for field in serializers.POST_FIELDS
+            if field != 'comment_count'
+        )
+        started = time.perf_counter()
+        rows = serializers.get_rows(
+            posts, serializers.POST_FIELDS, fields
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        fast_size = sum(map(len, serializers.stream_array(
+            serializers.to_dicts(rows, fields), EXPORT_CHUNK_SIZE
+        )))
+        fast_time = time.perf_counter() - started
+
+        encoder = 'orjson' if serializers.orjson is not None else 'json'
+        self.stdout.write(
+            f'Публикаций: {count}\n'
+            f'django.core.serializers: {django_time:.2f} с, '
+            f'{django_size / 2 ** 20:.1f} МБ\n'
+            f'blog.serializers ({encoder}): {fast_time:.2f} с, '
+            f'{fast_size / 2 ** 20:.1f} МБ '
+            f'(в {django_time / fast_time:.1f} раза быстрее)'
+        )
@@ -0,0 +1,58 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from blog import events
+from blog.api import stream_comments
+
+
+class Command(BaseCommand):
+    help = ('Замеряет память на одно SSE-подключение и время раздачи '
+            'событий открытым потокам без обращения к БД.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=10_000)
+        parser.add_argument('--messages', type=int, default=10)
+
+    def handle(self, *args, connections, messages, **options):
+        asyncio.run(self.measure(connections, messages))
+
+    async def read(self, broker, messages):
+        stream = stream_comments(0, None, broker)
+        received = 0
+        async for chunk in stream:
+            if not chunk.startswith(b':'):
+                received += 1
+            if received == messages:
+                break
+        await stream.aclose()
+
+    async def measure(self, connections, messages):
+        # Явно локальный брокер: DatabaseBroker по умолчанию опрашивает БД.
+        broker = events.LocalBroker()
+        channel = events.get_channel(0)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        readers = [
+            asyncio.create_task(self.read(broker, messages))
+            for _ in range(connections)
+        ]
+        while len(broker.subscriptions.get(channel, ())) < connections:
+            await asyncio.sleep(0)
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        started = time.perf_counter()
+        for i in range(1, messages + 1):
+            broker.publish(channel, {
+                'id': i, 'event': b'event: comment\ndata: {}\n\n'
+            })
+        await asyncio.gather(*readers)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Подключений: {connections}\n'
+            f'Память на подключение: {memory / connections / 1024:.1f} КБ\n'
+            f'Раздача {messages} событий: {elapsed:.2f} с '
+            f'({connections * messages / elapsed:,.0f} доставок/с)'
+        )
@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import timeline
+from blog.models import Category, Follow, Post
+from blog.views import get_posts_in_order
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время публикации и чтения ленты подписок в '
+            'зависимости от числа подписчиков. Данные откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--followers', type=int, nargs='+',
+            default=[10, 100, 1000, 5000]
+        )
+        parser.add_argument('--posts', type=int, default=20)
+        parser.add_argument('--reads', type=int, default=20)
+
+    def handle(self, *args, followers, posts, reads, **options):
+        for count in followers:
+            with transaction.atomic():
+                self.measure(count, posts, reads)
+                transaction.set_rollback(True)
+
+    def measure(self, count, posts, reads):
+        category = Category.objects.create(
+            title='Бенчмарк', slug='benchmark-timeline'
+        )
+        author = User.objects.create(username='benchmark-author')
+        readers = User.objects.bulk_create(
+            User(username=f'benchmark-reader-{i}') for i in range(count)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=author) for reader in readers
+        )
+        cache.delete(timeline.PULL_AUTHORS_KEY)
+        started = time.perf_counter()
+        for i in range(posts):
+            # Сигнал откладывает fan-out до фиксации транзакции, а она
+            # здесь откатывается, поэтому вызываем его явно.
+            timeline.fan_out(Post.objects.create(
+                title=f'Пост {i}', text='', author=author,
+                category=category, pub_date=timezone.now()
+            ))
+        write_time = (time.perf_counter() - started) / posts
+        reader = readers[0]
+        started = time.perf_counter()
+        for _ in range(reads):
+            get_posts_in_order([
+                post_id
+                for post_id, _ in timeline.get_timeline(reader)[:10]
+            ])
+        read_time = (time.perf_counter() - started) / reads
+        mode = 'fan-out' if timeline.is_fanout_author(author.id) else 'pull'
+        self.stdout.write(
+            f'Подписчиков: {count} ({mode}), '
+            f'публикация: {write_time * 1000:.1f} мс, '
+            f'чтение ленты: {read_time * 1000:.1f} мс'
+        )
@@ -0,0 +1,39 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import trending
+from blog.constants import TRENDING_COMMENT_WEIGHT
+
+
+class Command(BaseCommand):
+    help = ('Замеряет скорость пересчёта рейтинга на синтетических '
+            'событиях без обращения к БД.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--events-per-post', type=int, default=3)
+
+    def handle(self, *args, posts, events_per_post, **options):
+        now = timezone.now()
+        events = [
+            (random.randrange(posts), now - timedelta(
+                seconds=random.randrange(30 * 24 * 60 * 60)
+            ))
+            for _ in range(posts * events_per_post)
+        ]
+        started = time.perf_counter()
+        scores = trending.fold_events(events, TRENDING_COMMENT_WEIGHT)
+        fold_time = time.perf_counter() - started
+        started = time.perf_counter()
+        ranked = sorted(scores, key=scores.get, reverse=True)[:100]
+        sort_time = time.perf_counter() - started
+        self.stdout.write(
+            f'Событий: {len(events)}, публикаций: {len(scores)}\n'
+            f'Свёртка событий: {fold_time:.2f} с '
+            f'({len(events) / fold_time:,.0f} событий/с)\n'
+            f'Выборка топ-{len(ranked)}: {sort_time:.2f} с'
+        )
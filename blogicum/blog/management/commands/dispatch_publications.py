@@ -0,0 +1,68 @@
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduler import (
+    PublicationScheduler, acquire_lock, read_watermark, write_watermark
+)
+
+
+class Command(BaseCommand):
+    help = ('Отправляет событие post_became_visible, когда наступает '
+            'дата публикации отложенных постов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать наступившие публикации и выйти (для cron).'
+        )
+        parser.add_argument(
+            '--catch-up', type=int, default=60,
+            help='При первом запуске (нет сохранённой отметки) учесть '
+                 'публикации, наступившие за последние N секунд.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=30,
+            help='Как часто перечитывать очередь из БД, в секундах.'
+        )
+
+    def handle(self, *args, once, catch_up, poll_interval, **options):
+        path = settings.PUBLICATION_WATERMARK_PATH
+        lock = acquire_lock(path)
+        if lock is None:
+            self.stderr.write('Рассылка уже выполняется другим процессом.')
+            return
+        try:
+            self.run(path, once, catch_up, poll_interval)
+        finally:
+            os.close(lock)
+
+    def run(self, path, once, catch_up, poll_interval):
+        watermark = read_watermark(path) or (
+            timezone.now() - timedelta(seconds=catch_up), 0
+        )
+        scheduler = PublicationScheduler(*watermark)
+        scheduler.load()
+        reload_at = time.monotonic() + poll_interval
+        while True:
+            dispatched = scheduler.dispatch_due(timezone.now())
+            if dispatched:
+                write_watermark(path, scheduler.watermark)
+            for post_id in dispatched:
+                self.stdout.write(f'Опубликован пост {post_id}')
+            if once:
+                return
+            if time.monotonic() >= reload_at:
+                scheduler.load()
+                reload_at = time.monotonic() + poll_interval
+            next_due = scheduler.next_due()
+            delay = reload_at - time.monotonic()
+            if next_due is not None:
+                delay = min(
+                    delay, (next_due - timezone.now()).total_seconds()
+                )
+            time.sleep(max(delay, 0))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import comment_buffer
+from blog.constants import COMMENT_BUFFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Переносит буферизованные комментарии в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять сброс каждые N секунд; 0 — выполнить один раз.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=COMMENT_BUFFER_BATCH_SIZE
+        )
+
+    def handle(self, *args, interval, batch_size, **options):
+        while True:
+            comments = comment_buffer.flush(batch_size)
+            if comments:
+                self.stdout.write(f'Сохранено комментариев: {len(comments)}')
+            if not interval:
+                return
+            time.sleep(interval)
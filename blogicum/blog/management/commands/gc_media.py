@@ -0,0 +1,58 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import MEDIA_GC_BATCH_SIZE
+from blog.models import Post
+from blog.signals import is_image_used
+from blog.utils import batched
+
+
+def scan_files(path):
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из хранилища изображения публикаций, '
+            'на которые не ссылается ни одна публикация.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help='Не трогать файлы моложе N секунд (загрузки «в полёте»).'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, min_age, dry_run, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        root = storage.path(field.upload_to)
+        if not os.path.isdir(root):
+            return
+        deadline = time.time() - min_age
+        removed = 0
+        for entries in batched(scan_files(root), MEDIA_GC_BATCH_SIZE):
+            names = {
+                os.path.relpath(entry.path, storage.location).replace(
+                    os.sep, '/'
+                ): entry
+                for entry in entries
+                if entry.stat().st_mtime < deadline
+            }
+            referenced = set(Post.objects.filter(
+                image__in=names
+            ).values_list('image', flat=True))
+            for name in names.keys() - referenced:
+                if not dry_run and not storage.delete_unused(
+                    name, is_image_used, deadline
+                ):
+                    continue
+                removed += 1
+                self.stdout.write(name)
+        self.stdout.write(f'Неиспользуемых файлов: {removed}')
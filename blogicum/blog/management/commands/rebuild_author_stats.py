@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from blog.stats import rebuild_author_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику всех авторов.'
+
+    def handle(self, *args, **options):
+        rebuild_author_stats()
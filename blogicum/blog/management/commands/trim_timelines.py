@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog import timeline
+from blog.constants import TIMELINE_MAX_ENTRIES
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из лент подписок записи сверх лимита.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep', type=int, default=TIMELINE_MAX_ENTRIES,
+            help='Сколько последних записей оставлять каждому читателю.'
+        )
+
+    def handle(self, *args, keep, **options):
+        self.stdout.write(f'Удалено записей: {timeline.trim(keep)}')
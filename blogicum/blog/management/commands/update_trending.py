@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog import trending
+from blog.models import PostScore
+
+
+class Command(BaseCommand):
+    help = 'Учитывает новые комментарии в рейтинге популярных публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Сбросить рейтинг и пересчитать его по всем комментариям.'
+        )
+
+    def handle(self, *args, rebuild, **options):
+        if rebuild:
+            PostScore.objects.all().delete()
+        processed = trending.update_comment_scores()
+        self.stdout.write(f'Учтено комментариев: {processed}')
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+
+def rebuild_author_stats(apps, schema_editor):
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    Comment = apps.get_model('blog', 'Comment')
+    Post = apps.get_model('blog', 'Post')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    posts = {
+        row.pop('author'): row
+        for row in Post.objects.order_by().values('author').annotate(
+            post_count=Count('id'),
+            published_post_count=Count('id', filter=Q(is_published=True)),
+            last_post_date=Max('pub_date', filter=Q(
+                is_published=True,
+                pub_date__lte=timezone.now(),
+                category__is_published=True,
+            )),
+        )
+    }
+    written = dict(
+        Comment.objects.order_by().values('author').annotate(
+            count=Count('id')
+        ).values_list('author', 'count')
+    )
+    received = dict(
+        Comment.objects.order_by().values('post__author').annotate(
+            count=Count('id')
+        ).values_list('post__author', 'count')
+    )
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(
+                author_id=author_id,
+                comments_written=written.get(author_id, 0),
+                comments_received=received.get(author_id, 0),
+                **posts.get(author_id, {}),
+            )
+            for author_id in User.objects.values_list('id', flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0012_post_image_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('published_post_count', models.PositiveIntegerField(default=0, verbose_name='Опубликованных публикаций')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Получено комментариев')),
+                ('comments_written', models.PositiveIntegerField(default=0, verbose_name='Написано комментариев')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата последней публикации')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(rebuild_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_authorstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('score', models.FloatField(db_index=True, help_text='log2 суммы весов событий, затухающих со временем.', null=True, verbose_name='Рейтинг')),
+                ('last_comment_id', models.BigIntegerField(default=0, verbose_name='Последний учтённый комментарий')),
+            ],
+            options={
+                'verbose_name': 'рейтинг публикации',
+                'verbose_name_plural': 'Рейтинги публикаций',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_postscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewCount',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_count', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('views', models.PositiveBigIntegerField(default=0, verbose_name='Просмотры')),
+            ],
+            options={
+                'verbose_name': 'просмотры публикации',
+                'verbose_name_plural': 'Просмотры публикаций',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='buffer_id',
+            field=models.UUIDField(editable=False, null=True, unique=True, verbose_name='Запись буфера комментариев'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:52
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_visible_posts_announced(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category__is_published=True,
+    ).update(is_announced=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_comment_buffer_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_announced',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Появление разослано'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_announced', False), ('is_published', True)), fields=['pub_date', 'id'], name='post_unannounced_idx'),
+        ),
+        migrations.RunPython(
+            mark_visible_posts_announced, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,80 @@
+"""Кеш ключей, по которым объект заведомо не найден.
+
+Сканеры перебирают выдуманные id, слаги и имена; повторный запрос по
+такому ключу отвечает 404 без обращения к БД. Кеш ограничен по размеру
+(LRU) и по времени жизни записи: сигналы сбрасывают ключ при создании
+объекта в этом процессе, а TTL — в остальных.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from .constants import MISSING_CACHE_SIZE, MISSING_CACHE_TTL
+
+
+class MissingKeys:
+    def __init__(self, maxsize=MISSING_CACHE_SIZE, ttl=MISSING_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.expires = OrderedDict()
+
+    def __contains__(self, key):
+        with self.lock:
+            expires = self.expires.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self.expires[key]
+                return False
+            self.expires.move_to_end(key)
+            return True
+
+    def __len__(self):
+        return len(self.expires)
+
+    def add(self, key):
+        with self.lock:
+            self.expires[key] = time.monotonic() + self.ttl
+            self.expires.move_to_end(key)
+            if len(self.expires) > self.maxsize:
+                self.expires.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.expires.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.expires.clear()
+
+
+missing = MissingKeys()
+
+
+def get_or_404(queryset, key, exists=None, **lookup):
+    """Как ``get_object_or_404``, но запоминает ненайденный ключ.
+
+    ``exists`` — запрос для проверки существования, если 404 может
+    означать и скрытый объект; тогда запоминается только отсутствующий.
+    """
+    try:
+        return get_object_or_404(queryset, **lookup)
+    except Http404:
+        if exists is None or not exists.exists():
+            missing.add(key)
+        raise
+
+
+MISSING_KEY_FIELDS = {
+    'post': 'pk',
+    'category': 'slug',
+    'user': 'username',
+}
+
+
+def forget(kind, instance):
+    missing.discard((kind, getattr(instance, MISSING_KEY_FIELDS[kind])))
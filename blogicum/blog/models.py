@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from .constants import CATEGORY_TITLE_LENGTH, COMMENT_PREVIEW_LENGTH
+from .storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -89,18 +91,54 @@ class Post(PublishedModel):
         null=True,
         verbose_name='Категория'
     )
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='post_images',
+        storage=ContentAddressedStorage(),
+        blank=True,
+        db_index=True
+    )
+    is_announced = models.BooleanField(
+        'Появление разослано',
+        default=False,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_published_category_idx',
+            ),
+            models.Index(
+                fields=('pub_date', 'id'),
+                condition=models.Q(is_published=True, is_announced=False),
+                name='post_unannounced_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
 
+def published_posts_filter(prefix='', now=None):
+    return models.Q(**{
+        f'{prefix}is_published': True,
+        f'{prefix}pub_date__lte': now or timezone.now(),
+        f'{prefix}category__is_published': True,
+    })
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         'Post',
@@ -116,12 +154,166 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    buffer_id = models.UUIDField(
+        null=True,
+        unique=True,
+        editable=False,
+        verbose_name='Запись буфера комментариев'
+    )
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return (self.text[:COMMENT_PREVIEW_LENGTH])
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField('Публикаций', default=0)
+    published_post_count = models.PositiveIntegerField(
+        'Опубликованных публикаций', default=0
+    )
+    comments_received = models.PositiveIntegerField(
+        'Получено комментариев', default=0
+    )
+    comments_written = models.PositiveIntegerField(
+        'Написано комментариев', default=0
+    )
+    last_post_date = models.DateTimeField(
+        'Дата последней публикации', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.author)
+
+
+class PostScore(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Публикация'
+    )
+    score = models.FloatField(
+        'Рейтинг',
+        null=True,
+        db_index=True,
+        help_text='log2 суммы весов событий, затухающих со временем.'
+    )
+    last_comment_id = models.BigIntegerField(
+        'Последний учтённый комментарий', default=0
+    )
+
+    class Meta:
+        verbose_name = 'рейтинг публикации'
+        verbose_name_plural = 'Рейтинги публикаций'
+
+    def __str__(self):
+        return str(self.post)
+
+
+class PostViewCount(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='view_count',
+        verbose_name='Публикация'
+    )
+    views = models.PositiveBigIntegerField('Просмотры', default=0)
+
+    class Meta:
+        verbose_name = 'просмотры публикации'
+        verbose_name_plural = 'Просмотры публикаций'
+
+    def __str__(self):
+        return str(self.post)
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        verbose_name='Автор'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+
+    class Meta:
+        verbose_name = 'подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(user=models.F('author')),
+                name='no_self_follow'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Публикация'
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+
+    class Meta:
+        verbose_name = 'запись ленты подписок'
+        verbose_name_plural = 'Ленты подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date'), name='timeline_user_date_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user}: {self.post}'
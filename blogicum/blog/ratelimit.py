@@ -0,0 +1,111 @@
+"""Ограничение частоты запросов на запись (token bucket).
+
+Лимиты задаются в настройке RATE_LIMITS строками вида ``'30/m'``:
+ёмкость корзины и столько же жетонов за период. Корзины хранятся в
+кеше RATE_LIMIT_CACHE отдельно для пользователя и для IP; за обратным
+прокси IP клиента берётся из X-Forwarded-For с учётом TRUSTED_PROXY_COUNT
+(см. ``get_client_ip``). Проверка
+без блокировок: при гонке между процессами возможен лишний пропуск
+запроса, но не ложный отказ.
+
+Декоратор ``rate_limit`` помечает view; ``RateLimitMiddleware``
+проверяет лимит в ``process_view`` раньше CSRF, то есть до разбора
+тела запроса. Без middleware проверку выполняет сам декоратор.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def take_token(key, rate, now=None):
+    capacity, period = parse_rate(rate)
+    cache = caches[settings.RATE_LIMIT_CACHE]
+    now = time.time() if now is None else now
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    if tokens < 1:
+        return (1 - tokens) * period / capacity
+    cache.set(key, (tokens - 1, now), period)
+    return 0
+
+
+def get_client_ip(request):
+    # Каждый доверенный прокси дописывает в X-Forwarded-For адрес, с
+    # которого пришёл запрос; всё левее клиент мог подделать сам.
+    hops = settings.TRUSTED_PROXY_COUNT
+    forwarded = [
+        address.strip()
+        for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+        if address.strip()
+    ]
+    if hops and len(forwarded) >= hops:
+        return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR')
+
+
+def get_identities(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        yield 'user', user.pk
+    yield 'ip', get_client_ip(request)
+
+
+def check_rate_limit(request, scope):
+    request.rate_limit_checked = True
+    if request.method in SAFE_METHODS:
+        return None
+    limits = settings.RATE_LIMITS.get(scope, {})
+    for kind, identity in get_identities(request):
+        if kind not in limits:
+            continue
+        retry_after = take_token(
+            f'ratelimit:{scope}:{kind}:{identity}', limits[kind]
+        )
+        if retry_after:
+            response = HttpResponse(
+                'Слишком много запросов. Попробуйте позже.',
+                content_type='text/plain; charset=utf-8',
+                status=429,
+            )
+            response['Retry-After'] = int(retry_after) + 1
+            return response
+    return None
+
+
+def rate_limit(scope):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(request, 'rate_limit_checked', False):
+                response = check_rate_limit(request, scope)
+                if response is not None:
+                    return response
+            return view(request, *args, **kwargs)
+        wrapper.rate_limit_scope = scope
+        return wrapper
+    return decorator
+
+
+class RateLimitMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        scope = getattr(view_func, 'rate_limit_scope', None)
+        if scope is None:
+            return None
+        return check_rate_limit(request, scope)
@@ -0,0 +1,106 @@
+import fcntl
+import heapq
+import json
+import os
+from datetime import datetime
+
+from django.db.models import Q
+
+from .constants import SCHEDULER_BATCH_SIZE
+from .models import Post, published_posts_filter
+from .signals import post_became_visible
+
+
+class PublicationScheduler:
+    """Очередь ближайших отложенных публикаций на min-куче.
+
+    В очередь попадают только ещё не разосланные посты
+    (``is_announced=False``). Они подгружаются пачками по возрастанию
+    ``(pub_date, id)`` начиная с последней отправленной, поэтому куча
+    не растёт вместе с числом запланированных постов, а посты
+    с одинаковой ``pub_date`` на границе пачки не теряются.
+    """
+
+    def __init__(self, since, since_id=0, batch_size=SCHEDULER_BATCH_SIZE):
+        self.watermark = (since, since_id)
+        self.batch_size = batch_size
+        self.heap = []
+
+    def load(self):
+        pub_date, post_id = self.watermark
+        self.heap = list(
+            Post.objects.filter(
+                Q(pub_date__gt=pub_date)
+                | Q(pub_date=pub_date, id__gt=post_id),
+                is_published=True,
+                is_announced=False,
+                category__is_published=True,
+            ).order_by('pub_date', 'id').values_list(
+                'pub_date', 'id'
+            )[:self.batch_size]
+        )
+        heapq.heapify(self.heap)
+
+    def next_due(self):
+        return self.heap[0][0] if self.heap else None
+
+    def dispatch_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap))
+        if not due:
+            return []
+        # Видимость перепроверяется при выборке: пост могли скрыть
+        # после load(). Отметка ставится условным UPDATE, так что пост,
+        # уже объявленный при сохранении, второй раз не рассылается.
+        posts = Post.objects.filter(
+            published_posts_filter(now=now), is_announced=False
+        ).select_related('author', 'category', 'location').in_bulk(
+            [post_id for _, post_id in due]
+        )
+        dispatched = []
+        for pub_date, post_id in due:
+            if post_id in posts and Post.objects.filter(
+                pk=post_id, is_announced=False
+            ).update(is_announced=True):
+                post_became_visible.send(sender=Post, post=posts[post_id])
+                dispatched.append(post_id)
+        self.watermark = due[-1]
+        if not self.heap:
+            self.load()
+        return dispatched
+
+
+def read_watermark(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    return datetime.fromisoformat(data['pub_date']), data['id']
+
+
+def write_watermark(path, watermark):
+    pub_date, post_id = watermark
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump({'pub_date': pub_date.isoformat(), 'id': post_id}, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def acquire_lock(path):
+    """Эксклюзивная блокировка рядом с файлом отметки.
+
+    Возвращает дескриптор (держать до выхода) или None, если уже работает
+    другой экземпляр — перекрывающиеся запуски из cron не дублируют
+    события.
+    """
+    fd = os.open(f'{path}.lock', os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
@@ -0,0 +1,89 @@
+"""Сериализация публикаций, комментариев и категорий в JSON.
+
+Строки берутся из ``values_list()`` без создания экземпляров моделей и
+кодируются orjson, если он установлен, иначе стандартным ``json``.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Post
+from .utils import batched
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+CATEGORY_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}
+
+
+def image_url(name):
+    return Post.image.field.storage.url(name) if name else None
+
+
+CONVERTERS = {
+    'image': image_url,
+}
+
+
+def get_rows(queryset, available, fields, *extra):
+    return queryset.values_list(
+        *(available[field] for field in fields), *extra
+    )
+
+
+def to_dicts(rows, fields):
+    converters = [
+        (index, CONVERTERS[field])
+        for index, field in enumerate(fields) if field in CONVERTERS
+    ]
+    for row in rows:
+        if converters:
+            row = list(row)
+            for index, convert in converters:
+                row[index] = convert(row[index])
+        yield dict(zip(fields, row))
+
+
+if orjson is not None:
+    def dumps(data):
+        return orjson.dumps(data)
+else:
+    def dumps(data):
+        return json.dumps(
+            data, cls=DjangoJSONEncoder, ensure_ascii=False,
+            separators=(',', ':'),
+        ).encode()
+
+
+def stream_array(items, chunk_size):
+    yield b'['
+    separator = b''
+    for batch in batched(items, chunk_size):
+        yield separator + dumps(batch)[1:-1]
+        separator = b','
+    yield b']'
@@ -0,0 +1,144 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import aggregates, events, missing, stats, timeline
+from .backends import get_user_cache_key
+from .models import AuthorStats, Category, Comment, Post
+
+
+User = get_user_model()
+
+post_became_visible = Signal()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    cache.delete(get_user_cache_key(instance.pk))
+
+
+def is_image_used(name):
+    return Post.objects.filter(image=name).exists()
+
+
+def delete_unreferenced_image(name):
+    Post._meta.get_field('image').storage.delete_unused(name, is_image_used)
+
+
+@receiver(pre_save, sender=Post)
+def clean_replaced_image(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    old_name = Post.objects.filter(
+        pk=instance.pk
+    ).values_list('image', flat=True).first()
+    if old_name and old_name != instance.image.name:
+        transaction.on_commit(partial(delete_unreferenced_image, old_name))
+
+
+@receiver(post_delete, sender=Post)
+def clean_deleted_post_image(sender, instance, **kwargs):
+    if instance.image:
+        transaction.on_commit(
+            partial(delete_unreferenced_image, instance.image.name)
+        )
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(author=instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_post_stats(sender, instance, **kwargs):
+    stats.refresh_post_stats(instance.author_id)
+
+
+@receiver(post_became_visible)
+def update_visible_post_stats(sender, post, **kwargs):
+    stats.refresh_post_stats(post.author_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.count_comments([instance])
+
+
+@receiver(post_save, sender=Comment)
+def publish_created_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.publish_comments([instance])
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    stats.count_comments([instance], sign=-1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_became_visible)
+def invalidate_aggregates(sender, **kwargs):
+    aggregates.invalidate()
+
+
+def is_visible(post):
+    return (
+        post.is_published
+        and post.pub_date <= timezone.now()
+        and post.category is not None
+        and post.category.is_published
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_visibility(sender, instance, raw=False, **kwargs):
+    # Флаг is_announced сохраняется вместе с постом: скрытый или
+    # отложенный пост сбрасывает его и попадает в очередь рассыльщика,
+    # а уже разосланный не объявляется повторно ни правкой, ни им.
+    # Прежнее значение читается из БД — экземпляр мог устареть, пока
+    # рассыльщик отмечал пост.
+    if raw:
+        return
+    announced = instance.pk is not None and Post.objects.filter(
+        pk=instance.pk, is_announced=True
+    ).exists()
+    instance.is_announced = is_visible(instance)
+    instance._announce = instance.is_announced and not announced
+
+
+@receiver(post_save, sender=Post)
+def announce_visible_post(sender, instance, raw=False, **kwargs):
+    if not raw and instance._announce:
+        post_became_visible.send(sender=Post, post=instance)
+
+
+@receiver(post_became_visible)
+def fan_out_visible_post(sender, post, **kwargs):
+    transaction.on_commit(partial(timeline.fan_out, post))
+
+
+@receiver(post_save, sender=Post)
+def forget_missing_post(sender, instance, **kwargs):
+    missing.forget('post', instance)
+
+
+@receiver(post_save, sender=Category)
+def forget_missing_category(sender, instance, **kwargs):
+    missing.forget('category', instance)
+
+
+@receiver(post_save, sender=User)
+def forget_missing_user(sender, instance, **kwargs):
+    missing.forget('user', instance)
@@ -0,0 +1,96 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Max, Q
+
+from .constants import STATS_BATCH_SIZE
+from .models import AuthorStats, Comment, Post, published_posts_filter
+from .utils import batched
+
+
+User = get_user_model()
+
+STATS_FIELDS = (
+    'post_count', 'published_post_count', 'last_post_date',
+    'comments_written', 'comments_received',
+)
+
+
+def get_post_aggregates():
+    return {
+        'post_count': Count('id'),
+        'published_post_count': Count('id', filter=Q(is_published=True)),
+        # Дата показывается публично: отложенные и скрытые посты не в счёт.
+        'last_post_date': Max('pub_date', filter=published_posts_filter()),
+    }
+
+
+def refresh_post_stats(author_id):
+    AuthorStats.objects.filter(author_id=author_id).update(
+        **Post.objects.filter(author_id=author_id).aggregate(
+            **get_post_aggregates()
+        )
+    )
+
+
+def count_comments(comments, sign=1):
+    post_authors = {
+        comment.post_id: comment.post.author_id
+        for comment in comments
+        if Comment.post.is_cached(comment)
+    }
+    missing = {comment.post_id for comment in comments} - post_authors.keys()
+    if missing:
+        post_authors.update(
+            Post.objects.filter(id__in=missing).values_list('id', 'author_id')
+        )
+    written = Counter(comment.author_id for comment in comments)
+    received = Counter(
+        post_authors[comment.post_id]
+        for comment in comments
+        if comment.post_id in post_authors
+    )
+    for field, counts in (
+        ('comments_written', written), ('comments_received', received)
+    ):
+        for author_id, count in counts.items():
+            AuthorStats.objects.filter(author_id=author_id).update(
+                **{field: F(field) + sign * count}
+            )
+
+
+def rebuild_author_stats(batch_size=STATS_BATCH_SIZE):
+    posts = {
+        row.pop('author'): row
+        for row in Post.objects.order_by().values('author').annotate(
+            **get_post_aggregates()
+        )
+    }
+    written = dict(
+        Comment.objects.order_by().values('author').annotate(
+            count=Count('id')
+        ).values_list('author', 'count')
+    )
+    received = dict(
+        Comment.objects.order_by().values('post__author').annotate(
+            count=Count('id')
+        ).values_list('post__author', 'count')
+    )
+    author_ids = User.objects.values_list(
+        'id', flat=True
+    ).iterator(chunk_size=batch_size)
+    for batch in batched(author_ids, batch_size):
+        AuthorStats.objects.bulk_create(
+            [
+                AuthorStats(
+                    author_id=author_id,
+                    comments_written=written.get(author_id, 0),
+                    comments_received=received.get(author_id, 0),
+                    **posts.get(author_id, {}),
+                )
+                for author_id in batch
+            ],
+            update_conflicts=True,
+            unique_fields=['author'],
+            update_fields=STATS_FIELDS,
+        )
@@ -0,0 +1,55 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под именем sha256 их содержимого.
+
+    Повторная загрузка того же файла не создаёт копию: возвращается имя
+    уже сохранённого. Файл удаляется, когда на него не ссылается ни одна
+    публикация (см. ``blog.signals``).
+    """
+
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest.hexdigest() + extension)
+
+    def save(self, name, content, max_length=None):
+        name = self.get_content_name(name, content)
+        try:
+            # Переиспользованный файл «молодеет», чтобы сборщик мусора
+            # не удалил его, пока новая публикация ещё не сохранена.
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            return super().save(name, content, max_length)
+
+    def delete_unused(self, name, is_used, modified_before=None):
+        """Удаляет файл, если на него нет ссылок и его не переиспользовали.
+
+        Ссылки проверяются непосредственно перед удалением; изменившийся
+        за время проверки mtime означает параллельное сохранение того же
+        содержимого, и файл остаётся.
+        """
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+            if modified_before is not None and (
+                stat.st_mtime >= modified_before
+            ):
+                return False
+            if is_used(name) or os.stat(path).st_mtime_ns != stat.st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+        self.delete(name)
+        return True
@@ -0,0 +1,116 @@
+"""Лента подписок: fan-out при публикации и fan-out при чтении.
+
+Пост попадает в ``TimelineEntry`` каждого подписчика после фиксации
+транзакции, в которой он стал видимым. Для авторов с числом подписчиков
+больше TIMELINE_FANOUT_LIMIT записи не создаются — их посты подмешиваются
+в ленту при чтении. Множество таких авторов пересчитывается не чаще раза
+в TIMELINE_PULL_AUTHORS_TIMEOUT секунд.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .constants import (
+    TIMELINE_BACKFILL, TIMELINE_BATCH_SIZE, TIMELINE_FANOUT_LIMIT,
+    TIMELINE_MAX_ENTRIES, TIMELINE_PULL_AUTHORS_TIMEOUT
+)
+from .models import Follow, Post, TimelineEntry, published_posts_filter
+from .utils import batched
+
+
+PULL_AUTHORS_KEY = 'blog:timeline:pull_authors'
+
+
+def get_pull_authors():
+    authors = cache.get(PULL_AUTHORS_KEY)
+    if authors is None:
+        authors = frozenset(
+            Follow.objects.order_by().values('author').annotate(
+                follower_count=Count('id')
+            ).filter(
+                follower_count__gt=TIMELINE_FANOUT_LIMIT
+            ).values_list('author', flat=True)
+        )
+        cache.set(PULL_AUTHORS_KEY, authors, TIMELINE_PULL_AUTHORS_TIMEOUT)
+    return authors
+
+
+def is_fanout_author(author_id):
+    return author_id not in get_pull_authors()
+
+
+def fan_out(post):
+    if not is_fanout_author(post.author_id):
+        return 0
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    created = 0
+    for batch in batched(
+        follower_ids.iterator(chunk_size=TIMELINE_BATCH_SIZE),
+        TIMELINE_BATCH_SIZE,
+    ):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user_id=user_id, post=post, pub_date=post.pub_date
+                )
+                for user_id in batch
+            ],
+            ignore_conflicts=True,
+        )
+        created += len(batch)
+    return created
+
+
+def backfill(user, author):
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in Post.objects.filter(
+                published_posts_filter(), author=author
+            ).values_list('id', 'pub_date')[:TIMELINE_BACKFILL]
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def forget_author(user, author):
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+def get_timeline(user):
+    """Пары (post_id, pub_date) ленты читателя от новых к старым.
+
+    Ведущий индекс — ``timeline_user_date_idx``; посты авторов без
+    fan-out добавляются через UNION, только если читатель на них подписан.
+    """
+    entries = TimelineEntry.objects.filter(user=user).order_by().values_list(
+        'post_id', 'pub_date'
+    )
+    pull_authors = get_pull_authors()
+    if pull_authors:
+        followed = list(Follow.objects.filter(
+            user=user, author_id__in=pull_authors
+        ).values_list('author_id', flat=True))
+        if followed:
+            entries = entries.union(Post.objects.filter(
+                published_posts_filter(), author_id__in=followed
+            ).order_by().values_list('id', 'pub_date'))
+    return entries.order_by('-pub_date', '-post_id')
+
+
+def trim(max_entries=TIMELINE_MAX_ENTRIES):
+    trimmed = 0
+    overfull = TimelineEntry.objects.values('user').annotate(
+        entry_count=Count('id')
+    ).filter(entry_count__gt=max_entries).values_list('user', flat=True)
+    for user_id in overfull.iterator(chunk_size=TIMELINE_BATCH_SIZE):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        cutoff = entries.order_by('-pub_date', '-id').values_list(
+            'pub_date', 'id'
+        )[max_entries]
+        trimmed += entries.filter(
+            Q(pub_date__lt=cutoff[0])
+            | Q(pub_date=cutoff[0], id__lte=cutoff[1])
+        ).delete()[0]
+    return trimmed
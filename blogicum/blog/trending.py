@@ -0,0 +1,101 @@
+"""Рейтинг популярных публикаций с экспоненциальным затуханием.
+
+Вес события ``w * 2 ** (-(now - t) / half_life)`` хранится в лог-шкале
+относительно фиксированной эпохи: ``log2(w) + (t - EPOCH) / half_life``.
+Порядок таких значений не меняется со временем, поэтому новые события
+просто прибавляются к рейтингу, а пересчитывать старые не нужно.
+"""
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import Max
+
+from .constants import (
+    TRENDING_BATCH_SIZE, TRENDING_COMMENT_WEIGHT, TRENDING_VIEW_WEIGHT
+)
+from .models import Comment, PostScore
+from .utils import batched
+
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def event_score(moment, weight=1):
+    half_life = settings.TRENDING_HALF_LIFE.total_seconds()
+    return math.log2(weight) + (moment - EPOCH).total_seconds() / half_life
+
+
+def add_scores(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def fold_events(events, weight):
+    scores = {}
+    for post_id, moment in events:
+        scores[post_id] = add_scores(
+            scores.get(post_id), event_score(moment, weight)
+        )
+    return scores
+
+
+def apply_scores(scores, last_comment_ids=None):
+    last_comment_ids = last_comment_ids or {}
+    for post_ids in batched(scores, TRENDING_BATCH_SIZE):
+        current = PostScore.objects.in_bulk(post_ids)
+        PostScore.objects.bulk_create(
+            [
+                PostScore(
+                    post_id=post_id,
+                    score=add_scores(
+                        current[post_id].score if post_id in current
+                        else None,
+                        scores[post_id],
+                    ),
+                    last_comment_id=max(
+                        last_comment_ids.get(post_id, 0),
+                        current[post_id].last_comment_id
+                        if post_id in current else 0,
+                    ),
+                )
+                for post_id in post_ids
+            ],
+            update_conflicts=True,
+            unique_fields=['post'],
+            update_fields=['score', 'last_comment_id'],
+        )
+
+
+def add_views(view_counts, moment):
+    apply_scores({
+        post_id: event_score(moment, count * TRENDING_VIEW_WEIGHT)
+        for post_id, count in view_counts.items()
+    })
+
+
+def update_comment_scores():
+    last_id = PostScore.objects.aggregate(
+        last_id=Max('last_comment_id')
+    )['last_id'] or 0
+    comments = Comment.objects.filter(id__gt=last_id).order_by('id')
+    processed = 0
+    for batch in batched(
+        comments.values_list('id', 'post_id', 'created_at').iterator(
+            chunk_size=TRENDING_BATCH_SIZE
+        ),
+        TRENDING_BATCH_SIZE,
+    ):
+        apply_scores(
+            fold_events(
+                ((post_id, created_at) for _, post_id, created_at in batch),
+                TRENDING_COMMENT_WEIGHT,
+            ),
+            {post_id: comment_id for comment_id, post_id, _ in batch},
+        )
+        processed += len(batch)
+    return processed
@@ -0,0 +1,70 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+
+class PostImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку на диск и отбрасывает слишком большие изображения.
+
+    Размер проверяется по мере получения данных, а число пикселей —
+    по заголовку файла, без декодирования изображения. Причина отказа
+    сохраняется в ``request.upload_errors`` для формы.
+    """
+
+    def reject(self, message):
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = message
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_SIZE:
+            message = (
+                'Размер файла не должен превышать '
+                f'{filesizeformat(settings.POST_IMAGE_MAX_SIZE)}.'
+            )
+            self.reject(message)
+            raise SkipFile(message)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        try:
+            with Image.open(file) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            width = height = None
+        except (OSError, ValueError):
+            # Не изображение: ошибку покажет валидация ImageField.
+            file.seek(0)
+            return file
+        if width is None or width * height > settings.POST_IMAGE_MAX_PIXELS:
+            file.close()
+            self.reject(
+                'Изображение слишком большое: допускается не более '
+                f'{settings.POST_IMAGE_MAX_PIXELS} пикселей.'
+            )
+            return None
+        file.seek(0)
+        return file
+
+
+def post_image_uploads(view):
+    """Подключает PostImageUploadHandler только для загрузок этого view.
+
+    Обработчики нельзя менять после чтения ``request.POST``, а его читает
+    CsrfViewMiddleware, поэтому CSRF проверяется уже внутри декоратора.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, PostImageUploadHandler(request))
+        return protected(request, *args, **kwargs)
+    return wrapper
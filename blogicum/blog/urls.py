@@ -1,12 +1,13 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 
 app_name = 'blog'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('trending/', views.trending, name='trending'),
     path("posts/create/", views.create_post, name="create_post"),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.edit_post, name='edit_post'),
@@ -17,8 +18,28 @@ urlpatterns = [
          views.edit_comment, name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<comment_id>/',
          views.delete_comment, name='delete_comment'),
+    path('category/', views.category_index, name='category_index'),
     path('category/<slug:category_slug>/',
          views.category_posts, name='category_posts'),
+    path('archive/', views.archive, name='archive'),
+    path('archive/<int:year>/<int:month>/',
+         views.archive_month, name='archive_month'),
     path('profile/<str:username>/', views.profile_view, name='profile'),
+    path('profile/<str:username>/follow/',
+         views.profile_follow, name='profile_follow'),
+    path('profile/<str:username>/unfollow/',
+         views.profile_unfollow, name='profile_unfollow'),
+    path('follow/', views.follow_index, name='follow_index'),
     path('profile/user/edit/', views.edit_profile, name='edit_profile'),
+    path('api/posts/', api.post_list, name='api_post_list'),
+    path('api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path('api/posts/<int:post_id>/comments/',
+         api.comment_list, name='api_comment_list'),
+    path('api/posts/<int:post_id>/comments/updates/',
+         api.comment_updates, name='api_comment_updates'),
+    path('api/posts/<int:post_id>/comments/stream/',
+         api.comment_stream, name='api_comment_stream'),
+    path('api/csrf/', api.csrf_token, name='api_csrf_token'),
+    path('api/export/posts/', api.export_posts, name='api_export_posts'),
+    path('api/categories/', api.category_list, name='api_category_list'),
 ]
@@ -0,0 +1,26 @@
+import base64
+from datetime import datetime
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def encode_cursor(moment, pk):
+    return base64.urlsafe_b64encode(
+        f'{moment.isoformat()},{pk}'.encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    moment, pk = base64.urlsafe_b64decode(
+        cursor.encode()
+    ).decode().split(',')
+    return datetime.fromisoformat(moment), int(pk)
@@ -1,13 +1,28 @@
+from datetime import datetime
+
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db.models import Count, Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
-from .constants import POSTS_QUANTITY
+from pages.views import render_not_found
+
+from . import comment_buffer, events, timeline
+from .aggregates import get_archive_months, get_category_counts
+from .counters import get_views, view_counter
+from .constants import COMMENT_SUBMISSION_TIMEOUT, POSTS_QUANTITY
 from .forms import CommentForm, PostForm, ProfileEditForm
-from .models import Category, Comment, Post
+from .missing import get_or_404, missing
+from .models import (
+    Category, Comment, Follow, Post, PostScore, published_posts_filter
+)
+from .ratelimit import rate_limit
+from .uploadhandlers import post_image_uploads
+from .utils import encode_cursor
 
 
 def get_posts(
@@ -17,11 +32,7 @@ def get_posts(
     do_annotate=True
 ):
     if do_filter:
-        posts = posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
-        )
+        posts = posts.filter(published_posts_filter())
 
     if do_select_related:
         posts = posts.select_related('location', 'category', 'author')
@@ -47,21 +58,66 @@ def index(request):
     })
 
 
+def get_posts_in_order(post_ids):
+    posts = get_posts().filter(id__in=post_ids).in_bulk()
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+def trending(request):
+    # Страница читается по индексу score с LIMIT, а посты с числом
+    # комментариев догружаются только для её строк.
+    page_obj = paginate(
+        PostScore.objects.filter(
+            published_posts_filter('post__'), score__isnull=False
+        ).order_by('-score').values_list('post_id', flat=True),
+        request,
+    )
+    page_obj.object_list = get_posts_in_order(list(page_obj))
+    return render(request, 'blog/trending.html', {'page_obj': page_obj})
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    if post.author != request.user:
-        post = get_object_or_404(
-            get_posts(do_select_related=False, do_annotate=False), id=post_id)
+    key = ('post', post_id)
+    if key in missing:
+        return render_not_found(request)
+    post = get_or_404(
+        get_posts(do_filter=False, do_annotate=False).filter(
+            Q(author_id=request.user.id) | published_posts_filter()
+        ).select_related('view_count'),
+        key,
+        # Скрытый пост может стать видимым без сохранения (по pub_date).
+        exists=Post.objects.filter(id=post_id),
+        id=post_id,
+    )
+    view_counter.record(post.id)
+    comments = list(post.comments.select_related('author').order_by(
+        'created_at', 'id'
+    ))
     return render(request, 'blog/detail.html', {
         'post': post,
+        'view_count': get_views(post),
         'form': CommentForm(),
-        'comments': post.comments.all()
+        'comments': comments,
+        'comments_cursor': encode_cursor(
+            comments[-1].created_at, comments[-1].id
+        ) if comments else '',
+        'comments_stream': events.is_enabled(),
+        'pending_comments': comment_buffer.pending_for(post.id, request.user),
+    })
+
+
+def category_index(request):
+    return render(request, 'blog/category_index.html', {
+        'categories': get_category_counts(),
     })
 
 
 def category_posts(request, category_slug):
-    category = get_object_or_404(
-        Category, slug=category_slug, is_published=True
+    key = ('category', category_slug)
+    if key in missing:
+        return render_not_found(request)
+    category = get_or_404(
+        Category, key, slug=category_slug, is_published=True
     )
     return render(
         request,
@@ -76,8 +132,36 @@ def category_posts(request, category_slug):
     )
 
 
+def archive(request):
+    return render(request, 'blog/archive.html', {
+        'months': get_archive_months(),
+    })
+
+
+def archive_month(request, year, month):
+    try:
+        start = timezone.make_aware(datetime(year, month, 1))
+        end = timezone.make_aware(
+            datetime(year + month // 12, month % 12 + 1, 1)
+        )
+    except (ValueError, OverflowError):
+        raise Http404
+    return render(request, 'blog/archive_month.html', {
+        'month': start,
+        'page_obj': paginate(
+            get_posts().filter(pub_date__gte=start, pub_date__lt=end),
+            request,
+        ),
+    })
+
+
 def profile_view(request, username):
-    author = get_object_or_404(User, username=username)
+    key = ('user', username)
+    if key in missing:
+        return render_not_found(request)
+    author = get_or_404(
+        User.objects.select_related('stats'), key, username=username
+    )
     posts = get_posts(
         posts=author.posts.all(),
         do_filter=(author != request.user),
@@ -86,9 +170,45 @@ def profile_view(request, username):
     return render(request, 'blog/profile.html', {
         'profile': author,
         'page_obj': page_obj,
+        'following': (
+            request.user.is_authenticated
+            and Follow.objects.filter(
+                user=request.user, author=author
+            ).exists()
+        ),
     })
 
 
+@login_required
+def follow_index(request):
+    page_obj = paginate(timeline.get_timeline(request.user), request)
+    page_obj.object_list = get_posts_in_order(
+        [post_id for post_id, _ in page_obj]
+    )
+    return render(request, 'blog/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.method == 'POST' and author != request.user:
+        _, created = Follow.objects.get_or_create(
+            user=request.user, author=author
+        )
+        if created:
+            timeline.backfill(request.user, author)
+    return redirect('blog:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.method == 'POST':
+        Follow.objects.filter(user=request.user, author=author).delete()
+        timeline.forget_author(request.user, author)
+    return redirect('blog:profile', username)
+
+
 @login_required
 def edit_profile(request):
     user = request.user
@@ -99,9 +219,15 @@ def edit_profile(request):
     return render(request, 'blog/user.html', {'form': form})
 
 
+@post_image_uploads
 @login_required
+@rate_limit('post')
 def create_post(request):
-    form = PostForm(request.POST or None, request.FILES)
+    form = PostForm(
+        request.POST or None,
+        request.FILES,
+        upload_errors=getattr(request, 'upload_errors', None)
+    )
     if not form.is_valid():
         return render(request, 'blog/create.html', {'form': form})
     post = form.save(commit=False)
@@ -110,11 +236,17 @@ def create_post(request):
     return redirect('blog:profile', request.user.username)
 
 
+@post_image_uploads
 def edit_post(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if post.author != request.user:
         return redirect('blog:post_detail', post.id)
-    form = PostForm(request.POST or None, request.FILES or None, instance=post)
+    form = PostForm(
+        request.POST or None,
+        request.FILES or None,
+        instance=post,
+        upload_errors=getattr(request, 'upload_errors', None)
+    )
     if form.is_valid():
         form.save()
         return redirect('blog:post_detail', post.id)
@@ -132,10 +264,34 @@ def delete_post(request, post_id):
     return render(request, 'blog/create.html', {'post': post})
 
 
+def is_repeated_submission(request, key):
+    # Повторная отправка той же формы (двойной клик, повтор после таймаута)
+    # не создаёт второй комментарий.
+    return bool(key) and not cache.add(
+        f'blog:comment_submission:{request.user.id}:{key}', True,
+        COMMENT_SUBMISSION_TIMEOUT,
+    )
+
+
 @login_required
+@rate_limit('comment')
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, id=post_id)
+    if not form.is_valid():
+        return redirect('blog:post_detail', post_id)
+    post = get_object_or_404(
+        Post.objects.filter(
+            Q(author_id=request.user.id) | published_posts_filter()
+        ).only('id', 'author_id'),
+        id=post_id,
+    )
+    if is_repeated_submission(request, form.cleaned_data['idempotency_key']):
+        return redirect('blog:post_detail', post.id)
+    if comment_buffer.is_enabled():
+        comment_buffer.append(
+            post.id, request.user.id, form.cleaned_data['text']
+        )
+        return redirect('blog:post_detail', post.id)
     comment = form.save(commit=False)
     comment.post = post
     comment.author = request.user
@@ -0,0 +1,104 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified,
+    StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .middleware import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+
+CONTENT_ADDRESSED_NAME = re.compile(r'^[0-9a-f]{64}\.\w+$')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    match = RANGE_HEADER.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime
+    ):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    mode = settings.MEDIA_SERVE_MODE
+
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Sendfile'] = full_path
+    elif mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        )
+    else:
+        try:
+            byte_range = parse_range(
+                request.META.get('HTTP_RANGE'), stat.st_size
+            )
+        except ValueError:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(
+                open(full_path, 'rb'), content_type=content_type
+            )
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(full_path, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response.headers['Content-Range'] = (
+                f'bytes {start}-{end}/{stat.st_size}'
+            )
+            response.headers['Content-Length'] = end - start + 1
+        response.headers['Accept-Ranges'] = 'bytes'
+
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    response.headers['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL
+        if CONTENT_ADDRESSED_NAME.match(os.path.basename(path))
+        else REVALIDATE_CACHE_CONTROL
+    )
+    return response
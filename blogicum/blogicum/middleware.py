@@ -0,0 +1,125 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .storage import get_encodings
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+def parse_accept_encoding(header):
+    """Кодировки из Accept-Encoding с их весом q; q=0 означает запрет."""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """Раздаёт собранную статику из STATIC_ROOT без обращения к view.
+
+    Включается настройкой STATIC_SERVE; файлы с хешем в имени отдаются
+    с бессрочным кешированием, сжатые копии — по Accept-Encoding.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        prefix = settings.STATIC_URL
+        if settings.STATIC_SERVE and request.path.startswith(prefix):
+            response = self.serve(request, request.path[len(prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime
+        ):
+            return HttpResponseNotModified()
+        content_type, _ = mimetypes.guess_type(name)
+        accepted = parse_accept_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encoding, best, compressed_path = None, 0, path
+        for candidate, suffix, _ in get_encodings():
+            quality = accepted.get(candidate, accepted.get('*', 0))
+            if quality > best and os.path.isfile(path + suffix):
+                encoding, best, compressed_path = (
+                    candidate, quality, path + suffix
+                )
+        path = compressed_path
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        response.headers['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL
+            if name in staticfiles_storage.hashed_names
+            else REVALIDATE_CACHE_CONTROL
+        )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class AnonymousCacheMiddleware:
+    """Разрешает общий кеш для ответов анонимным посетителям.
+
+    Если в запросе нет сессионной cookie, а ответ не ставит cookie и сам
+    не задаёт Cache-Control, страница одинакова для всех анонимов
+    и получает ``Cache-Control: public``. ``Vary: Cookie`` сохраняется:
+    анонимы без cookie делят одну запись кеша, а пользователю с сессией
+    прокси не отдаст чужую страницу. Запросы с сессией получают
+    ``private``.
+    Middleware должен стоять выше SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in ('GET', 'HEAD')
+            or response.has_header('Cache-Control')
+        ):
+            return response
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            patch_cache_control(response, private=True)
+        elif response.status_code == 200 and not response.cookies:
+            patch_cache_control(
+                response, public=True, max_age=settings.ANONYMOUS_CACHE_MAX_AGE
+            )
+        return response
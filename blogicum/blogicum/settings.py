@@ -1,3 +1,5 @@
+import os
+from datetime import timedelta
 from pathlib import Path
 
 
@@ -26,8 +28,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.middleware.StaticFilesMiddleware',
+    'blogicum.middleware.AnonymousCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'blog.ratelimit.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -49,6 +54,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.category_sidebar',
             ],
         },
     },
@@ -60,9 +66,67 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
     }
 }
 
+if os.getenv('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB'),
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('POSTGRES_DISABLE_SERVER_SIDE_CURSORS') == '1'
+        ),
+        'OPTIONS': {},
+    }
+    if os.getenv('POSTGRES_POOL', '1') == '1':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('POSTGRES_POOL_TIMEOUT', 10)),
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(
+            os.getenv('POSTGRES_CONN_MAX_AGE', 60)
+        )
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+# Например, CACHE_BACKEND=django.core.cache.backends.redis.RedisCache и
+# CACHE_LOCATION=redis://127.0.0.1:6379/1.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', LOCMEM_CACHE),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'blogicum'),
+    }
+}
+
+# Сессии и пользователи кешируются, только если кеш общий для всех
+# процессов: инвалидация из locmem не доходит до соседних воркеров.
+if CACHES['default']['BACKEND'] != LOCMEM_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+    AUTHENTICATION_BACKENDS = [
+        'blog.backends.CachedModelBackend',
+    ]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -94,12 +158,33 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+STATIC_SERVE = False
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'blogicum.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_SERVE_MODE = 'stream'
+
+POST_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 4096 * 4096
+
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -109,3 +194,37 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+CATEGORY_SIDEBAR = False
+
+TRENDING_HALF_LIFE = timedelta(hours=12)
+
+VIEW_COUNTER_FLUSH_INTERVAL = 10
+
+VIEW_COUNTER_MAX_PENDING = 1000
+
+# Индекс несброшенных комментариев хранится в кеше default, поэтому
+# буфер требует общего кеша (см. CACHE_BACKEND).
+COMMENT_BUFFER_ENABLED = False
+
+COMMENT_BUFFER_PATH = BASE_DIR / 'comment_buffer.log'
+
+PUBLICATION_WATERMARK_PATH = BASE_DIR / 'publication_watermark.json'
+
+COMMENT_EVENTS_ENABLED = False
+
+COMMENT_EVENTS_BROKER = 'blog.events.DatabaseBroker'
+
+RATE_LIMIT_CACHE = 'default'
+
+# Число доверенных обратных прокси перед приложением (например, 1 для
+# nginx): IP клиента берётся из X-Forwarded-For, а не из REMOTE_ADDR.
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
+RATE_LIMITS = {
+    'comment': {'user': '30/m', 'ip': '120/m'},
+    'post': {'user': '20/m', 'ip': '60/m'},
+    'registration': {'ip': '20/h'},
+}
+
+ANONYMOUS_CACHE_MAX_AGE = 60
@@ -0,0 +1,62 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.map',
+)
+
+
+def gzip_compress(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def get_encodings():
+    encodings = [('gzip', '.gz', gzip_compress)]
+    if brotli is not None:
+        encodings.insert(0, ('br', '.br', brotli.compress))
+    return encodings
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хешированные имена и сжатые копии статики для долгого кеширования.
+
+    Если ``collectstatic`` ещё не запускался (разработка, тесты), шаблоны
+    получают исходные имена файлов вместо ошибки отсутствия манифеста.
+    """
+
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hashed_names = frozenset(self.hashed_files.values())
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        self.hashed_names = frozenset(self.hashed_files.values())
+        for name in self.hashed_names:
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        for _, suffix, compress in get_encodings():
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                with open(self.path(name + suffix), 'wb') as target:
+                    target.write(compressed)
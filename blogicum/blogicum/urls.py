@@ -1,12 +1,17 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import include, path, reverse
+from django.utils.decorators import method_decorator
 
+from blog.ratelimit import rate_limit
 
+from .media import serve_media
+
+
+@method_decorator(rate_limit('registration'), name='dispatch')
 class UserRegisterView(CreateView):
     template_name = 'registration/registration_form.html'
     form_class = UserCreationForm
@@ -33,7 +38,12 @@ urlpatterns = [
         UserRegisterView.as_view(),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}<path:path>',
+        serve_media,
+        name='media',
+    ),
+]
 
 
 handler403 = 'pages.views.csrf_failure'
@@ -0,0 +1,91 @@
+"""Страницы, которые рендерятся один раз и отдаются из памяти.
+
+Шаблон рендерится с метками на месте шапки, боковой колонки и
+переменных частей страницы; на каждый запрос рендерятся только эти
+фрагменты. Для анонимных посетителей шапка и колонка кешируются по
+маршруту (если боковая колонка выключена).
+"""
+import re
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SLOT_TEMPLATES = {
+    'header': 'includes/header.html',
+    'sidebar': 'includes/sidebar.html',
+}
+
+
+class RenderedPage:
+    def __init__(self, template_name, values=()):
+        self.template_name = template_name
+        self.slots = (*SLOT_TEMPLATES, *values)
+        self.parts = None
+        self.anonymous = {}
+
+    def get_parts(self):
+        if self.parts is None:
+            token = uuid4().hex
+            html = render_to_string(self.template_name, {
+                'page_slots': {
+                    slot: mark_safe(f'<!--slot:{slot}:{token}-->')
+                    for slot in self.slots
+                },
+            })
+            parts = re.split(f'<!--slot:(\\w+):{token}-->', html)
+            # Чётные элементы — готовый HTML, нечётные — имена слотов.
+            self.parts = [
+                part if index % 2 else part.encode()
+                for index, part in enumerate(parts)
+            ]
+        return self.parts
+
+    def render_slots(self, request, context=None):
+        return {
+            slot: render_to_string(template_name, context, request).encode()
+            for slot, template_name in SLOT_TEMPLATES.items()
+        }
+
+    def get_slots(self, request, personal):
+        user = getattr(request, 'user', None) if personal else None
+        if user is not None and user.is_authenticated:
+            return self.render_slots(request)
+        match = getattr(request, 'resolver_match', None)
+        view_name = match and match.view_name
+        slots = self.anonymous.get(view_name)
+        if slots is None:
+            # Шапка для анонимов зависит только от текущего маршрута.
+            slots = self.render_slots(request, {'user': AnonymousUser()})
+            if not settings.CATEGORY_SIDEBAR:
+                self.anonymous[view_name] = slots
+        return slots
+
+    def render(self, request, status=200, personal=True, **values):
+        if settings.DEBUG:
+            return render(request, self.template_name, status=status)
+        slots = {
+            **self.get_slots(request, personal),
+            **{name: escape(value).encode() for name, value in values.items()},
+        }
+        return HttpResponse(
+            b''.join(
+                slots[part] if isinstance(part, str) else part
+                for part in self.get_parts()
+            ),
+            status=status,
+        )
+
+
+pages = {}
+
+
+def get_page(template_name, values=()):
+    if template_name not in pages:
+        pages[template_name] = RenderedPage(template_name, values)
+    return pages[template_name]
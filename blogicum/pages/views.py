@@ -1,22 +1,50 @@
+from django.http import HttpResponseNotFound
 from django.views.generic import TemplateView
-from django.shortcuts import render
 
+from .rendering import get_page
 
-class AboutPage(TemplateView):
+NOT_FOUND_BODY = b'<!DOCTYPE html><title>404</title><h1>Not Found</h1>'
+
+
+class RenderedOnceView(TemplateView):
+    def get(self, request, *args, **kwargs):
+        return get_page(self.template_name).render(request)
+
+
+class AboutPage(RenderedOnceView):
     template_name = 'pages/about.html'
 
 
-class RulesPage(TemplateView):
+class RulesPage(RenderedOnceView):
     template_name = 'pages/rules.html'
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'pages/403csrf.html', status=403)
+    return get_page('pages/403csrf.html').render(request, status=403)
+
+
+def is_page_request(request):
+    if '.' in request.path.rsplit('/', 1)[-1]:
+        # /wp-login.php, /.env и т. п.: у сайта нет страниц с расширением.
+        return False
+    accept = request.headers.get('Accept')
+    return not accept or 'text/html' in accept or '*/*' in accept
 
 
 def page_not_found(request, exception):
-    return render(request, 'pages/404.html', status=404)
+    if not is_page_request(request):
+        return HttpResponseNotFound(NOT_FOUND_BODY)
+    return render_not_found(request)
+
+
+def render_not_found(request):
+    """404 без рендера шаблона: запрошенный адрес подставляется в слот."""
+    return get_page('pages/404.html', values=('url',)).render(
+        request, status=404, url=request.build_absolute_uri()
+    )
 
 
 def error_500(request):
-    return render(request, 'pages/500.html', status=500)
+    return get_page('pages/500.html').render(
+        request, status=500, personal=False
+    )
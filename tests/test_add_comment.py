@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment
+
+
+def comment_url(post):
+    return f"/posts/{post.id}/comment/"
+
+
+def blog_queries(ctx, verb):
+    return [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith(verb) and '"blog_' in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_happy_path_is_single_insert(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get(f"/posts/{post.id}/")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(comment_url(post), {"text": "Текст"})
+
+    assert response.status_code == 302
+    assert len(blog_queries(ctx, "INSERT")) == 1
+    post_selects = [
+        sql for sql in blog_queries(ctx, "SELECT") if 'FROM "blog_post"' in sql
+    ]
+    assert len(post_selects) == 1, "Пост и видимость — одним запросом."
+    assert '"text"' not in post_selects[0]
+
+
+@pytest.mark.django_db
+def test_invalid_comment_does_not_touch_posts(
+        user_client, post_with_published_location
+):
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(
+            comment_url(post_with_published_location), {"text": ""}
+        )
+    assert response.status_code == 302
+    assert not blog_queries(ctx, "SELECT") and not blog_queries(ctx, "INSERT")
+
+
+@pytest.mark.django_db
+def test_comment_on_hidden_post_is_rejected(
+        user_client, another_user, mixer
+):
+    post = mixer.blend("blog.Post", author=another_user, is_published=False)
+    response = user_client.post(comment_url(post), {"text": "Текст"})
+    assert response.status_code == 404
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_repeated_submission_is_ignored(
+        user_client, post_with_published_location
+):
+    url = comment_url(post_with_published_location)
+    for key in ("a" * 32, "a" * 32, "b" * 32):
+        user_client.post(url, {"text": "Текст", "idempotency_key": key})
+    assert Comment.objects.count() == 2
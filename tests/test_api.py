@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import serializers
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 6)),
+    )
+
+
+@pytest.fixture
+def unpublished_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, image="", pub_date=timezone.now(),
+    )
+
+
+@pytest.mark.django_db
+def test_post_list_cursor_pagination(client, api_posts, unpublished_post):
+    seen = []
+    url = "/api/posts/?limit=2"
+    while url:
+        data = client.get(url).json()
+        seen += [post["id"] for post in data["results"]]
+        url = data["next"] and f"/api/posts/?limit=2&cursor={data['next']}"
+    assert seen == [post.id for post in api_posts]
+
+
+@pytest.mark.django_db
+def test_sparse_fields_limit_columns(client, api_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        data = client.get("/api/posts/?fields=id,author").json()
+    assert data["results"][0] == {
+        "id": api_posts[0].id, "author": api_posts[0].author.username
+    }
+    sql = ctx.captured_queries[-1]["sql"]
+    assert '"text"' not in sql and "blog_location" not in sql
+    assert client.get("/api/posts/?fields=password").status_code == 400
+
+
+@pytest.mark.django_db
+def test_post_detail_visibility(
+        client, user_client, unpublished_post, api_posts
+):
+    assert client.get(f"/api/posts/{unpublished_post.id}/").status_code == 404
+    data = user_client.get(
+        f"/api/posts/{unpublished_post.id}/?fields=title,image"
+    ).json()
+    assert data == {"title": unpublished_post.title, "image": None}
+
+
+@pytest.mark.django_db
+def test_comment_list_and_etag(client, mixer, api_posts):
+    post = api_posts[0]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    url = f"/api/posts/{post.id}/comments/?fields=id"
+
+    response = client.get(url)
+    assert [row["id"] for row in response.json()["results"]] == [
+        comment.id for comment in comments
+    ]
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+    assert client.post(url).status_code == 405
+
+
+@pytest.mark.django_db
+def test_export_posts_streams_visible_posts(
+        client, api_posts, unpublished_post
+):
+    response = client.get("/api/export/posts/?fields=id,image")
+    assert response.streaming
+    data = json.loads(b"".join(response.streaming_content))
+    assert data == [
+        {"id": post.id, "image": post.image.url} for post in api_posts
+    ]
+
+
+def test_stream_array_matches_json_encoding():
+    rows = [{"id": i, "title": f"Пост {i}"} for i in range(5)]
+    assert json.loads(b"".join(serializers.stream_array(rows, 2))) == rows
+    assert b"".join(serializers.stream_array([], 2)) == b"[]"
+
+
+@pytest.mark.django_db
+def test_comment_updates_return_only_new_comments(
+        user_client, mixer, api_posts
+):
+    post = api_posts[0]
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    cursor = user_client.get(f"/posts/{post.id}/").context["comments_cursor"]
+    url = f"/api/posts/{post.id}/comments/updates/"
+
+    new_comment = mixer.blend("blog.Comment", post=post)
+    data = user_client.get(url, {"cursor": cursor}).json()
+    assert data["count"] == 1
+    assert f'name="comment_{new_comment.id}"' in data["html"]
+
+    data = user_client.get(url, {"cursor": data["cursor"]}).json()
+    assert data["count"] == 0 and data["html"] == ""
+    assert user_client.get(url, {"cursor": "bad"}).status_code == 400
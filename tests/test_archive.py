@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.fixture
+def archive_posts(mixer, user, published_category):
+    dates = [
+        timezone.make_aware(datetime(2023, 1, 31, 23, 59)),
+        timezone.make_aware(datetime(2023, 2, 1)),
+        timezone.make_aware(datetime(2023, 2, 15)),
+        timezone.make_aware(datetime(2023, 12, 31)),
+    ]
+    return mixer.cycle(len(dates)).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=(date for date in dates),
+    )
+
+
+@pytest.mark.django_db
+def test_archive_lists_months_with_counts(client, archive_posts):
+    response = client.get("/archive/")
+    months = [
+        (row["month"].year, row["month"].month, row["post_count"])
+        for row in response.context["months"]
+    ]
+    assert months == [(2023, 12, 1), (2023, 2, 2), (2023, 1, 1)]
+    assert 'href="/archive/2023/2/"' in response.content.decode("utf-8")
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/archive/")
+    assert not ctx.captured_queries, "Архив месяцев должен браться из кеша."
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("url", "expected_ix"),
+    [("/archive/2023/1/", [0]), ("/archive/2023/2/", [2, 1]),
+     ("/archive/2023/12/", [3])],
+)
+def test_archive_month_is_bounded_by_month(
+        client, archive_posts, url, expected_ix
+):
+    response = client.get(url)
+    assert [post.id for post in response.context["page_obj"]] == [
+        archive_posts[ix].id for ix in expected_ix
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url",
+    ["/archive/2023/13/", "/archive/2023/0/", "/archive/9999/12/",
+     "/archive/99999999999999999999/1/"],
+)
+def test_archive_month_rejects_invalid_month(client, url):
+    assert client.get(url).status_code == 404
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import AuthorStats
+
+STATS_FIELDS = (
+    "post_count", "published_post_count", "last_post_date",
+    "comments_written", "comments_received",
+)
+
+
+def get_stats(user):
+    return AuthorStats.objects.values(*STATS_FIELDS).get(author=user)
+
+
+@pytest.mark.django_db
+def test_stats_are_maintained_incrementally(
+        mixer, user, another_user, published_category
+):
+    now = timezone.now()
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=(value for value in (True, True, False)),
+        pub_date=(now - timedelta(days=days) for days in (2, 1, 0)),
+    )
+    comments = mixer.cycle(2).blend(
+        "blog.Comment", post=posts[0], author=another_user
+    )
+
+    stats = get_stats(user)
+    assert stats["post_count"] == 3
+    assert stats["published_post_count"] == 2
+    assert stats["last_post_date"] == posts[1].pub_date, (
+        "Скрытые публикации не должны влиять на дату последней публикации."
+    )
+    assert stats["comments_received"] == 2
+    assert get_stats(another_user)["comments_written"] == 2
+
+    comments[0].delete()
+    posts[2].delete()
+    stats = get_stats(user)
+    assert stats["post_count"] == 2
+    assert stats["comments_received"] == 1
+    assert get_stats(another_user)["comments_written"] == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_stats(
+        mixer, user, another_user, published_category
+):
+    posts = mixer.cycle(4).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    mixer.cycle(3).blend("blog.Comment", post=posts[1], author=another_user)
+    mixer.blend("blog.Comment", post=posts[2], author=user)
+    expected = {u.id: get_stats(u) for u in (user, another_user)}
+    AuthorStats.objects.update(post_count=0, comments_received=0)
+
+    with CaptureQueriesContext(connection) as ctx:
+        call_command("rebuild_author_stats")
+
+    assert {u.id: get_stats(u) for u in (user, another_user)} == expected
+    assert len(ctx.captured_queries) <= 5, (
+        "Пересчёт должен выполняться группирующими запросами, а не по автору."
+    )
+
+
+@pytest.mark.django_db
+def test_profile_shows_stats(mixer, user, client, published_category):
+    mixer.cycle(2).blend("blog.Post", author=user, category=published_category)
+    content = client.get(f"/profile/{user.username}/").content.decode("utf-8")
+    assert "Публикаций: 2" in content
+
+
+@pytest.mark.django_db
+def test_last_post_date_ignores_scheduled_posts(
+        mixer, user, published_category
+):
+    now = timezone.now()
+    published = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now - timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(days=30),
+    )
+
+    assert get_stats(user)["last_post_date"] == published.pub_date
+    call_command("rebuild_author_stats")
+    assert get_stats(user)["last_post_date"] == published.pub_date
@@ -0,0 +1,64 @@
+import pytest
+from django.conf import settings
+from django.test import Client
+from django.utils.cache import cc_delim_re
+
+from blog.models import Comment
+
+
+def vary(response):
+    return cc_delim_re.split(response.get("Vary", ""))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/", "/posts/{id}/", "/pages/about/"])
+def test_anonymous_pages_are_public(client, post_with_published_location, url):
+    response = client.get(url.format(id=post_with_published_location.id))
+
+    assert response.status_code == 200
+    assert not response.cookies, "Анонимная страница не должна ставить cookie."
+    assert "Cookie" in vary(response), (
+        "Vary: Cookie защищает пользователей с сессией от общей копии."
+    )
+    assert "public" in response["Cache-Control"]
+    assert f"max-age={settings.ANONYMOUS_CACHE_MAX_AGE}" in (
+        response["Cache-Control"]
+    )
+    assert 'name="csrfmiddlewaretoken"' not in response.content.decode(
+        "utf-8"
+    )
+
+
+@pytest.mark.django_db
+def test_pages_with_session_are_private(
+        user_client, post_with_published_location
+):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+
+    assert "private" in response["Cache-Control"]
+    assert "public" not in response["Cache-Control"]
+    assert 'name="csrfmiddlewaretoken"' in response.content.decode("utf-8"), (
+        "Форма комментария должна работать и без JavaScript."
+    )
+
+
+@pytest.mark.django_db
+def test_csrf_token_endpoint(client):
+    response = client.get("/api/csrf/")
+
+    assert response.json()["token"]
+    assert settings.CSRF_COOKIE_NAME in response.cookies
+    assert "no-store" in response["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_comment_with_lazily_fetched_token(user, post_with_published_location):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    url = f"/posts/{post_with_published_location.id}/comment/"
+
+    assert client.post(url, {"text": "Без токена"}).status_code == 403
+
+    token = client.get("/api/csrf/").json()["token"]
+    client.post(url, {"text": "С токеном", "csrfmiddlewaretoken": token})
+    assert Comment.objects.filter(text="С токеном").exists()
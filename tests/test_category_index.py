@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def category_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        q for q in ctx.captured_queries if "blog_category" in q["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_category_index_counts_visible_posts(
+        mixer, user, client, published_category, another_category
+):
+    mixer.cycle(2).blend("blog.Post", author=user, category=published_category)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    hidden = mixer.blend("blog.Category", is_published=False)
+
+    response, queries = category_queries(client, "/category/")
+    counts = {
+        category.id: category.post_count
+        for category in response.context["categories"]
+    }
+    assert counts[published_category.id] == 2
+    assert counts[another_category.id] == 0
+    assert hidden.id not in counts
+    assert len(queries) == 1, "Счётчики должны считаться одним запросом."
+
+    _, queries = category_queries(client, "/category/")
+    assert not queries, "Повторный запрос должен брать счётчики из кеша."
+
+    mixer.blend("blog.Post", author=user, category=another_category)
+    response, _ = category_queries(client, "/category/")
+    counts = {c.id: c.post_count for c in response.context["categories"]}
+    assert counts[another_category.id] == 1
+
+
+@pytest.mark.django_db
+def test_category_sidebar(settings, client, mixer, user, published_category):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    content = client.get("/").content.decode("utf-8")
+    assert "/category/\"" not in content
+
+    settings.CATEGORY_SIDEBAR = True
+    content = client.get("/").content.decode("utf-8")
+    assert 'href="/category/"' in content
+    assert published_category.title in content
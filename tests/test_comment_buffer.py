@@ -0,0 +1,158 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog import comment_buffer
+from blog.models import Comment
+
+
+@pytest.fixture
+def buffered_comments(tmp_path):
+    with override_settings(
+        COMMENT_BUFFER_ENABLED=True,
+        COMMENT_BUFFER_PATH=tmp_path / "comments.log",
+    ):
+        yield tmp_path / "comments.log"
+
+
+@pytest.mark.django_db
+def test_buffered_comment_is_visible_to_author_before_flush(
+        user_client, another_user_client, post_with_published_location,
+        buffered_comments
+):
+    post_url = f"/posts/{post_with_published_location.id}/"
+    text = "Буферизованный комментарий"
+
+    user_client.post(f"{post_url}comment/", {"text": text})
+
+    assert not Comment.objects.exists(), (
+        "В буферизованном режиме комментарий не должен сразу писаться в БД."
+    )
+    assert text in user_client.get(post_url).content.decode("utf-8")
+    assert text not in another_user_client.get(post_url).content.decode(
+        "utf-8"
+    )
+
+
+@pytest.mark.django_db
+def test_flush_comments_writes_batch(
+        user_client, post_with_published_location, buffered_comments
+):
+    post_url = f"/posts/{post_with_published_location.id}/"
+    for i in range(3):
+        user_client.post(f"{post_url}comment/", {"text": f"Комментарий {i}"})
+    user_client.post("/posts/0/comment/", {"text": "К несуществующему посту"})
+    user_client.post(f"{post_url}comment/", {"text": ""})
+
+    call_command("flush_comments")
+
+    assert list(
+        Comment.objects.values_list("text", flat=True)
+    ) == [f"Комментарий {i}" for i in range(3)]
+    assert not buffered_comments.exists()
+    content = user_client.get(post_url).content.decode("utf-8")
+    assert content.count("Комментарий 0") == 1
+
+
+@pytest.mark.django_db
+def test_pending_comments_do_not_rescan_log(
+        user_client, post_with_published_location, buffered_comments,
+        monkeypatch
+):
+    post_url = f"/posts/{post_with_published_location.id}/"
+    user_client.post(f"{post_url}comment/", {"text": "Ещё в буфере"})
+
+    def fail(path):
+        raise AssertionError("Страница поста не должна читать журнал.")
+
+    monkeypatch.setattr(comment_buffer, "read_records", fail)
+    assert "Ещё в буфере" in user_client.get(post_url).content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_flush_is_idempotent_after_crash(
+        user_client, post_with_published_location, buffered_comments,
+        monkeypatch
+):
+    post_url = f"/posts/{post_with_published_location.id}/"
+    user_client.post(f"{post_url}comment/", {"text": "Один раз"})
+    # Сбой между фиксацией транзакции и удалением журнала.
+    monkeypatch.setattr(Path, "unlink", lambda self: None)
+    call_command("flush_comments")
+    monkeypatch.undo()
+
+    call_command("flush_comments")
+
+    assert Comment.objects.filter(text="Один раз").count() == 1
+    assert not comment_buffer.get_flushing_path().exists()
+    content = user_client.get(post_url).content.decode("utf-8")
+    assert content.count("Один раз") == 1
+
+
+@pytest.mark.django_db
+def test_buffered_comment_checks_visibility_and_repeats(
+        user_client, another_user, post_with_published_location,
+        buffered_comments
+):
+    hidden = post_with_published_location
+    hidden.author = another_user
+    hidden.is_published = False
+    hidden.save()
+    response = user_client.post(f"/posts/{hidden.id}/comment/", {"text": "Х"})
+    assert response.status_code == 404
+    assert not buffered_comments.exists()
+
+    hidden.is_published = True
+    hidden.save()
+    data = {"text": "Один раз", "idempotency_key": "a" * 32}
+    for _ in range(2):
+        user_client.post(f"/posts/{hidden.id}/comment/", data)
+    call_command("flush_comments")
+    assert Comment.objects.filter(text="Один раз").count() == 1
+
+
+@pytest.mark.django_db
+def test_flush_drops_comments_to_posts_hidden_meanwhile(
+        user, user_client, another_user_client, post_with_published_location,
+        buffered_comments
+):
+    post = post_with_published_location
+    assert post.author == user
+    url = f"/posts/{post.id}/comment/"
+    user_client.post(url, {"text": "От автора"})
+    another_user_client.post(url, {"text": "От читателя"})
+    post.is_published = False
+    post.save()
+
+    call_command("flush_comments")
+
+    assert list(Comment.objects.values_list("text", flat=True)) == [
+        "От автора"
+    ]
+
+
+@pytest.mark.django_db
+def test_flush_keeps_submission_time(
+        user, post_with_published_location, buffered_comments
+):
+    submitted = timezone.now() - timedelta(minutes=5)
+    record = {
+        "id": uuid4().hex,
+        "post": post_with_published_location.id,
+        "author": user.id,
+        "text": "Отправлен раньше сброса",
+        "created_at": submitted.isoformat(),
+    }
+    comment_buffer.write_line(
+        buffered_comments, (json.dumps(record) + "\n").encode()
+    )
+
+    comment_buffer.flush()
+
+    assert Comment.objects.get(buffer_id=record["id"]).created_at == submitted
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+
+from blog import events
+from blog.events import DatabaseBroker, LocalBroker
+from blog.models import Comment
+from blog.utils import encode_cursor
+
+
+def test_local_broker_fans_out_across_threads():
+    async def main():
+        broker = LocalBroker()
+        first = broker.subscribe("post:1")
+        second = broker.subscribe("post:1")
+        other = broker.subscribe("post:2")
+        thread = threading.Thread(
+            target=broker.publish, args=("post:1", {"id": 1})
+        )
+        thread.start()
+        thread.join()
+        messages = await asyncio.gather(first.get(), second.get())
+        for subscription in (first, second, other):
+            broker.unsubscribe(subscription)
+        return messages, other.queue.empty(), dict(broker.subscriptions)
+
+    messages, other_is_empty, subscriptions = asyncio.run(main())
+    assert messages == [{"id": 1}, {"id": 1}]
+    assert other_is_empty
+    assert not subscriptions, "Пустые каналы должны удаляться."
+
+
+def parse_event(chunk):
+    fields = dict(
+        line.split(": ", 1) for line in chunk.decode().strip().split("\n")
+    )
+    return fields["id"], json.loads(fields["data"])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_stream_replays_missed_and_pushes_new(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    missed = mixer.blend("blog.Comment", post=post)
+
+    async def main():
+        response = await AsyncClient().get(
+            f"/api/posts/{post.id}/comments/stream/",
+            headers={"Last-Event-ID": encode_cursor(
+                missed.created_at - timedelta(seconds=1), 0
+            )},
+        )
+        assert response["Content-Type"] == "text/event-stream"
+        stream = aiter(response.streaming_content)
+        replayed = parse_event(await anext(stream))
+        created = await sync_to_async(mixer.blend)(
+            "blog.Comment", post=post
+        )
+        pushed = parse_event(await asyncio.wait_for(anext(stream), 5))
+        await stream.aclose()
+        return replayed, pushed, created
+
+    with override_settings(COMMENT_EVENTS_ENABLED=True):
+        replayed, pushed, created = asyncio.run(main())
+    assert replayed[1]["id"] == missed.id
+    assert pushed[1]["id"] == created.id
+    assert f'name="comment_{created.id}"' in pushed[1]["html"]
+    assert not events.get_broker().subscriptions
+
+
+@pytest.mark.django_db(transaction=True)
+def test_database_broker_delivers_comments_saved_elsewhere(
+        post_with_published_location, monkeypatch
+):
+    monkeypatch.setattr(events, "SSE_POLL_INTERVAL", 0.05)
+    post = post_with_published_location
+    channel = events.get_channel(post.id)
+
+    async def main():
+        broker = DatabaseBroker()
+        subscription = broker.subscribe(channel)
+        # Другой воркер или flush_comments: bulk_create без сигналов
+        # и без локальной публикации в этом процессе.
+        comment, = await sync_to_async(Comment.objects.bulk_create)(
+            [Comment(post=post, author=post.author, text="Из другого воркера")]
+        )
+        message = await asyncio.wait_for(subscription.get(), 5)
+        duplicate = broker.publish(channel, {"id": comment.id, "event": b""})
+        broker.unsubscribe(subscription)
+        await asyncio.sleep(0.2)
+        return comment, message, duplicate, broker.poller
+
+    comment, message, duplicate, poller = asyncio.run(main())
+    assert message["id"] == comment.id
+    assert b"event: comment" in message["event"]
+    assert duplicate == 0, "Уже доставленный комментарий не рассылается."
+    assert poller is None, "Без подписчиков опрос БД должен остановиться."
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+WRITERS = 4
+ROWS_PER_WRITER = 50
+
+
+def open_tuned_connection(db_path):
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "NAME": str(db_path),
+    }
+    wrapper = DatabaseWrapper(settings_dict, alias="stress")
+    wrapper.ensure_connection()
+    return wrapper
+
+
+@pytest.fixture
+def stress_db(tmp_path):
+    if connections["default"].vendor != "sqlite":
+        pytest.skip("Профиль настроек относится только к SQLite.")
+    db_path = tmp_path / "stress.sqlite3"
+    wrapper = open_tuned_connection(db_path)
+    with wrapper.cursor() as cursor:
+        cursor.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, val TEXT)")
+        cursor.execute("INSERT INTO item (val) VALUES ('initial')")
+    wrapper.close()
+    return db_path
+
+
+@pytest.mark.django_db
+def test_sqlite_connection_is_tuned(stress_db):
+    wrapper = open_tuned_connection(stress_db)
+    with wrapper.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1, "Ожидался synchronous=NORMAL."
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] > 0
+    wrapper.close()
+
+
+@pytest.mark.django_db
+def test_readers_are_not_blocked_by_writer(stress_db):
+    writer = open_tuned_connection(stress_db)
+    writer_cursor = writer.connection.cursor()
+    writer_cursor.execute("BEGIN EXCLUSIVE")
+    writer_cursor.execute("INSERT INTO item (val) VALUES ('uncommitted')")
+
+    results = []
+
+    def read():
+        reader = open_tuned_connection(stress_db)
+        started = time.monotonic()
+        with reader.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM item")
+            results.append((cursor.fetchone()[0], time.monotonic() - started))
+        reader.close()
+
+    try:
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join(timeout=10)
+    finally:
+        writer_cursor.execute("COMMIT")
+        writer.close()
+
+    assert results, "Чтение не завершилось, пока открыта транзакция записи."
+    count, elapsed = results[0]
+    assert count == 1, "Читатель должен видеть последнее зафиксированное состояние."
+    assert elapsed < 1, "Читатель ждал окончания транзакции записи."
+
+
+@pytest.mark.django_db
+def test_concurrent_writers_do_not_fail(stress_db):
+    errors = []
+
+    def write(n):
+        wrapper = open_tuned_connection(stress_db)
+        try:
+            for i in range(ROWS_PER_WRITER):
+                with wrapper.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO item (val) VALUES (%s)", [f"{n}-{i}"]
+                    )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            wrapper.close()
+
+    threads = [
+        threading.Thread(target=write, args=(n,)) for n in range(WRITERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, f"Параллельная запись завершилась ошибкой: {errors}"
+    wrapper = open_tuned_connection(stress_db)
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM item")
+        assert cursor.fetchone()[0] == 1 + WRITERS * ROWS_PER_WRITER
+    wrapper.close()
+
+
+@pytest.mark.django_db
+def test_post_visibility_indexes_exist():
+    from blog.models import Post
+
+    connection = connections["default"]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Post._meta.db_table
+        )
+    for name in ("post_published_pub_date_idx", "post_published_category_idx"):
+        assert name in constraints, f"Индекс `{name}` не создан миграциями."
+
+
+@pytest.mark.django_db
+def test_postgresql_indexes_are_partial():
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        pytest.skip("Запускается только с профилем PostgreSQL (POSTGRES_DB).")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE indexname = %s",
+            ["post_published_pub_date_idx"],
+        )
+        (indexdef,) = cursor.fetchone()
+    assert "WHERE is_published" in indexdef
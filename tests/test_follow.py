@@ -0,0 +1,122 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import timeline
+from blog.models import Follow, TimelineEntry
+
+
+def follow(client, author):
+    return client.post(f"/profile/{author.username}/follow/")
+
+
+@pytest.fixture
+def publish(mixer, published_category, django_capture_on_commit_callbacks):
+    def publish(author, **kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            return mixer.blend("blog.Post", **{
+                "author": author, "category": published_category,
+                "is_published": True, "pub_date": timezone.now(), **kwargs
+            })
+    return publish
+
+
+@pytest.mark.django_db
+def test_follow_backfills_and_fans_out(
+        user, user_client, another_user, another_user_client, publish
+):
+    old_post = publish(another_user)
+    follow(user_client, another_user)
+    follow(another_user_client, another_user)
+
+    assert Follow.objects.filter(user=user, author=another_user).exists()
+    assert not Follow.objects.filter(author=another_user, user=another_user)
+    assert set(
+        user.timeline.values_list("post", flat=True)
+    ) == {old_post.id}
+
+    new_post = publish(another_user)
+    content = user_client.get("/follow/").content.decode("utf-8")
+    assert old_post.title in content and new_post.title in content
+
+    user_client.post(f"/profile/{another_user.username}/unfollow/")
+    assert not user.timeline.exists()
+    assert new_post.title not in user_client.get("/follow/").content.decode(
+        "utf-8"
+    )
+
+
+@pytest.mark.django_db
+def test_hidden_post_is_not_fanned_out(
+        user, user_client, another_user, publish
+):
+    follow(user_client, another_user)
+    publish(another_user, is_published=False)
+    assert not user.timeline.exists()
+
+
+@pytest.mark.django_db
+def test_popular_author_is_pulled_on_read(
+        monkeypatch, user, user_client, another_user, another_user_client,
+        mixer, publish
+):
+    monkeypatch.setattr(timeline, "TIMELINE_FANOUT_LIMIT", 1)
+    follow(user_client, another_user)
+    mixer.blend("blog.Follow", author=another_user)
+
+    post = publish(another_user)
+
+    assert not TimelineEntry.objects.filter(post=post).exists()
+    assert post.title in user_client.get("/follow/").content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_trim_timelines_keeps_latest(user, user_client, another_user, publish):
+    follow(user_client, another_user)
+    posts = [publish(another_user) for _ in range(5)]
+
+    call_command("trim_timelines", keep=2)
+
+    latest = sorted(posts, key=lambda post: (post.pub_date, post.id))[-2:]
+    assert set(user.timeline.values_list("post", flat=True)) == {
+        post.id for post in latest
+    }
+
+
+@pytest.mark.django_db
+def test_fan_out_waits_for_commit(
+        user, user_client, another_user, mixer, published_category
+):
+    follow(user_client, another_user)
+    mixer.blend(
+        "blog.Post", author=another_user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    assert not user.timeline.exists(), (
+        "Fan-out должен выполняться после фиксации транзакции."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_is_read_from_timeline_entries(
+        user, user_client, another_user, publish
+):
+    follow(user_client, another_user)
+    post = publish(another_user)
+    user_client.get("/follow/")
+
+    with CaptureQueriesContext(connection) as ctx:
+        content = user_client.get("/follow/").content.decode("utf-8")
+
+    assert post.title in content
+    sql = [query["sql"] for query in ctx.captured_queries]
+    assert not [query for query in sql if "HAVING" in query], (
+        "Авторы без fan-out не должны пересчитываться на каждый запрос."
+    )
+    assert [
+        query for query in sql
+        if query.startswith('SELECT "blog_timelineentry"."post_id"')
+        and "ORDER BY" in query and "LIMIT" in query
+    ], "Страница ленты должна читаться из TimelineEntry."
@@ -0,0 +1,93 @@
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+
+from blog.models import Post
+
+
+def make_image(color):
+    img_io = BytesIO()
+    Image.new("RGB", (10, 10), color=color).save(img_io, format="JPEG")
+    return ImageFile(img_io, name="Photo.JPG")
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(image):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category, image=image
+        )
+    return make
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_one_file(media_root, make_post):
+    first = make_post(make_image("red"))
+    second = make_post(make_image("red"))
+    other = make_post(make_image("blue"))
+
+    assert first.image.name == second.image.name
+    assert first.image.name != other.image.name
+    assert os.path.basename(first.image.name)[:-4].isalnum()
+    assert first.image.name.endswith(".jpg")
+    assert len(os.listdir(media_root / "post_images")) == 2
+
+
+@pytest.mark.django_db
+def test_image_removed_with_last_reference(
+        media_root, make_post, django_capture_on_commit_callbacks
+):
+    first = make_post(make_image("red"))
+    second = make_post(make_image("red"))
+    path = media_root / first.image.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert path.exists(), "Файл ещё используется другой публикацией."
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = make_image("green")
+        second.save()
+    assert not path.exists(), "Заменённое изображение должно удаляться."
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=second.pk).delete()
+    assert not os.listdir(media_root / "post_images")
+
+
+@pytest.mark.django_db
+def test_gc_media_removes_orphans(media_root, make_post):
+    post = make_post(make_image("red"))
+    orphan = media_root / "post_images" / "orphan.jpg"
+    orphan.write_bytes(b"orphan")
+
+    call_command("gc_media", "--min-age=0", "--dry-run")
+    assert orphan.exists()
+
+    call_command("gc_media", "--min-age=0")
+    assert not orphan.exists()
+    assert (media_root / post.image.name).exists()
+
+
+@pytest.mark.django_db
+def test_reused_file_survives_gc_and_concurrent_delete(media_root):
+    storage = Post._meta.get_field("image").storage
+    name = storage.save("post_images/photo.jpg", make_image("red"))
+    path = media_root / name
+    os.utime(path, (0, 0))
+
+    # Та же картинка загружается снова, но публикация ещё не сохранена.
+    assert storage.save("post_images/other.jpg", make_image("red")) == name
+    call_command("gc_media")
+    assert path.exists(), "Переиспользованный файл не должен считаться старым."
+
+    def reused_during_check(checked_name):
+        os.utime(path, (1, 1))
+        return False
+
+    assert not storage.delete_unused(name, reused_during_check)
+    assert path.exists()
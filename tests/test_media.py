@@ -0,0 +1,73 @@
+import pytest
+from django.test import override_settings
+
+CONTENT = bytes(range(256)) * 4
+HASHED_NAME = "a" * 64 + ".jpg"
+
+
+@pytest.fixture
+def media_root(media_root):
+    (media_root / "post_images").mkdir()
+    for name in ("photo.jpg", HASHED_NAME):
+        (media_root / "post_images" / name).write_bytes(CONTENT)
+    with override_settings(MEDIA_SERVE_MODE="stream"):
+        yield media_root
+
+
+@pytest.mark.django_db
+def test_media_is_streamed_with_cache_headers(client, media_root):
+    response = client.get("/media/post_images/photo.jpg")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" not in response["Cache-Control"]
+
+    response = client.get(f"/media/post_images/{HASHED_NAME}")
+    assert "immutable" in response["Cache-Control"], (
+        "Файлы с именем по хешу содержимого должны кешироваться бессрочно."
+    )
+
+    not_modified = client.get(
+        "/media/post_images/photo.jpg",
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    )
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-9", CONTENT[:10]),
+        ("bytes=1000-", CONTENT[1000:]),
+        ("bytes=-5", CONTENT[-5:]),
+    ],
+)
+def test_media_range_requests(client, media_root, header, expected):
+    response = client.get("/media/post_images/photo.jpg", HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert b"".join(response.streaming_content) == expected
+    assert response["Content-Length"] == str(len(expected))
+    assert response["Content-Range"].endswith(f"/{len(CONTENT)}")
+
+
+@pytest.mark.django_db
+def test_media_unsatisfiable_range(client, media_root):
+    response = client.get(
+        "/media/post_images/photo.jpg", HTTP_RANGE="bytes=5000-"
+    )
+    assert response.status_code == 416
+
+
+@pytest.mark.django_db
+def test_media_offloaded_to_front_server(client, media_root):
+    with override_settings(MEDIA_SERVE_MODE="x-accel-redirect"):
+        response = client.get("/media/post_images/photo.jpg")
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_images/photo.jpg"
+    )
+    assert response.content == b""
+
+    with override_settings(MEDIA_SERVE_MODE="x-sendfile"):
+        response = client.get("/media/post_images/photo.jpg")
+    assert response["X-Sendfile"] == str(media_root / "post_images" / "photo.jpg")
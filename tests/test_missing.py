@@ -0,0 +1,62 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.missing import MissingKeys, missing
+
+
+@pytest.fixture(autouse=True)
+def clean_missing():
+    missing.clear()
+    yield
+    missing.clear()
+
+
+@pytest.mark.django_db
+def test_repeated_missing_post_skips_db(
+        client, mixer, user, published_category
+):
+    assert client.get("/posts/9999/").status_code == 404
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/posts/9999/")
+    assert response.status_code == 404
+    assert not ctx.captured_queries
+    assert "/posts/9999/" in response.content.decode("utf-8")
+
+    mixer.blend(
+        "blog.Post", id=9999, author=user, category=published_category,
+        is_published=True,
+    )
+    assert client.get("/posts/9999/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_hidden_post_is_not_remembered(client, user_client, mixer, user):
+    post = mixer.blend("blog.Post", author=user, is_published=False)
+    assert client.get(f"/posts/{post.id}/").status_code == 404
+    assert ("post", post.id) not in missing
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_missing_profile_and_category_are_forgotten_on_create(client, mixer):
+    for url in ("/profile/ghost/", "/category/ghost/"):
+        assert client.get(url).status_code == 404
+    assert ("user", "ghost") in missing and ("category", "ghost") in missing
+
+    mixer.blend("auth.User", username="ghost")
+    mixer.blend("blog.Category", slug="ghost", is_published=True)
+    assert client.get("/profile/ghost/").status_code == 200
+    assert client.get("/category/ghost/").status_code == 200
+
+
+def test_missing_keys_are_bounded_and_expire():
+    keys = MissingKeys(maxsize=2, ttl=60)
+    for key in ("a", "b", "c"):
+        keys.add(key)
+    assert "a" not in keys and "b" in keys and "c" in keys
+
+    expired = MissingKeys(maxsize=2, ttl=-1)
+    expired.add("a")
+    assert "a" not in expired and not len(expired)
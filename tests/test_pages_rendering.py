@@ -0,0 +1,48 @@
+import pytest
+
+from pages.views import NOT_FOUND_BODY, error_500
+
+
+@pytest.mark.django_db
+def test_static_page_is_rendered_once(client, user, user_client):
+    first = client.get("/pages/about/")
+    second = client.get("/pages/about/")
+    assert first.content == second.content
+    assert not second.templates, "Повтор не должен рендерить шаблоны."
+    assert "Регистрация" in second.content.decode("utf-8")
+
+    response = user_client.get("/pages/about/")
+    content = response.content.decode("utf-8")
+    assert "pages/about.html" not in [t.name for t in response.templates]
+    assert f"/profile/{user.username}/" in content
+    assert "О проекте" in content and "Регистрация" not in content
+
+
+@pytest.mark.django_db
+def test_error_500_ignores_user(rf, user):
+    request = rf.get("/")
+    request.user = user
+    content = error_500(request).content.decode("utf-8")
+    assert "Ошибка сервера" in content and user.username not in content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("url", "headers"),
+    [("/wp-login.php", {}), ("/.env", {}),
+     ("/nothing-here/", {"Accept": "application/json"})],
+)
+def test_bot_404_fast_path(client, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 404
+    assert response.content == NOT_FOUND_BODY
+    assert not response.templates
+
+
+@pytest.mark.django_db
+def test_html_404_is_rendered_once(client):
+    client.get("/no-such-page/")
+    response = client.get("/another-missing-page/")
+    assert response.status_code == 404
+    assert not response.templates, "Повтор не должен рендерить шаблоны."
+    assert "/another-missing-page/" in response.content.decode("utf-8")
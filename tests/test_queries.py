@@ -0,0 +1,132 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.backends import CachedModelBackend, check_shared_cache
+
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+# Соседний воркер: сохраняет пользователя и отправляет post_save,
+# как это делают выход, смена пароля и блокировка.
+INVALIDATE_SCRIPT = """
+import sys
+import django
+django.setup()
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+post_save.send(User, instance=User(pk=int(sys.argv[1])), created=False)
+"""
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    location = str(tmp_path / "cache")
+    settings.CACHES = {
+        "default": {"BACKEND": FILE_CACHE, "LOCATION": location}
+    }
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    settings.AUTHENTICATION_BACKENDS = ["blog.backends.CachedModelBackend"]
+    return location
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_authenticated_feed_skips_session_and_user_queries(
+        shared_cache, user_client, many_posts_with_published_locations
+):
+    cold = count_queries(user_client, "/")
+    warm = count_queries(user_client, "/")
+    assert warm < cold, (
+        "Повторный запрос ленты должен брать сессию и пользователя из кеша."
+    )
+    assert warm == 2, "Ожидались только запросы количества и страницы постов."
+
+
+@pytest.mark.django_db
+def test_profile_edit_invalidates_cached_user(
+        shared_cache, user, user_client
+):
+    user_client.get("/")
+    user_client.post(
+        "/profile/user/edit/",
+        {"username": "renamed", "first_name": "", "last_name": "",
+         "email": "renamed@example.com"},
+    )
+    content = user_client.get("/").content.decode("utf-8")
+    assert "renamed" in content, (
+        "После редактирования профиля в шапке должно отображаться новое имя."
+    )
+
+
+@pytest.mark.django_db
+def test_cached_user_is_invalidated_from_another_process(
+        shared_cache, user, settings
+):
+    backend = CachedModelBackend()
+    old_password = backend.get_user(user.id).password
+    User.objects.filter(id=user.id).update(password="changed")
+    assert backend.get_user(user.id).password == old_password
+
+    subprocess.run(
+        [sys.executable, "-c", INVALIDATE_SCRIPT, str(user.id)],
+        cwd=settings.BASE_DIR,
+        env={
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "blogicum.settings",
+            "CACHE_BACKEND": FILE_CACHE,
+            "CACHE_LOCATION": shared_cache,
+        },
+        check=True,
+    )
+
+    assert backend.get_user(user.id).password == "changed", (
+        "Инвалидация в другом процессе должна сбрасывать кеш пользователя."
+    )
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db"),
+    ("AUTHENTICATION_BACKENDS", ["blog.backends.CachedModelBackend"]),
+    ("COMMENT_BUFFER_ENABLED", True),
+])
+def test_cross_process_state_requires_shared_cache(settings, setting, value):
+    check_shared_cache()
+    setattr(settings, setting, value)
+    with pytest.raises(ImproperlyConfigured):
+        check_shared_cache()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["index", "post_detail"])
+def test_anonymous_pages_skip_session_and_user(
+        client, post_with_published_location, comment_to_a_post, url_name,
+        settings
+):
+    settings.VIEW_COUNTER_FLUSH_INTERVAL = 60 * 60
+    url = {
+        "index": "/",
+        "post_detail": f"/posts/{post_with_published_location.id}/",
+    }[url_name]
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    sql = [query["sql"] for query in ctx.captured_queries]
+    assert not [q for q in sql if "django_session" in q], (
+        "Анонимный запрос без cookie не должен обращаться к сессиям."
+    )
+    assert len(sql) == 2, (
+        "Ожидались два запроса: посты (или пост) и их количество"
+        " (или комментарии с авторами)."
+    )
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog import ratelimit
+from blog.models import Comment
+
+
+@pytest.fixture
+def tight_limits():
+    with override_settings(RATE_LIMITS={
+        "comment": {"user": "3/m", "ip": "100/m"},
+        "registration": {"ip": "2/h"},
+    }):
+        yield
+
+
+@pytest.mark.django_db
+def test_comment_burst_is_throttled_per_user(
+        user_client, another_user_client, post_with_published_location,
+        tight_limits
+):
+    url = f"/posts/{post_with_published_location.id}/comment/"
+    for i in range(3):
+        response = user_client.post(url, {"text": f"Комментарий {i}"})
+        assert response.status_code == 302
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(url, {"text": "Лишний"})
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) > 0
+    assert not any("INSERT" in q["sql"] for q in ctx.captured_queries)
+    assert Comment.objects.count() == 3
+
+    assert another_user_client.post(url, {"text": "Другой"}).status_code == 302
+    assert user_client.get(
+        f"/posts/{post_with_published_location.id}/"
+    ).status_code == 200
+
+
+@pytest.mark.django_db
+def test_registration_is_throttled_per_ip(client, tight_limits):
+    statuses = [
+        client.post("/auth/registration/", {
+            "username": f"new_user_{i}",
+            "password1": "Very-Secret-1234",
+            "password2": "Very-Secret-1234",
+        }).status_code
+        for i in range(3)
+    ]
+    assert statuses[-1] == 429
+    assert 429 not in statuses[:2]
+
+
+def test_token_bucket_refills_over_time(tight_limits):
+    now = time.time()
+    waits = [ratelimit.take_token("test", "2/m", now) for _ in range(3)]
+    assert waits == [0, 0, 30]
+    assert ratelimit.take_token("test", "2/m", now + 30) == 0
+
+
+@pytest.mark.parametrize(("hops", "forwarded", "expected"), [
+    (0, "203.0.113.7", "10.0.0.1"),
+    (1, "203.0.113.7", "203.0.113.7"),
+    (1, "198.51.100.1, 203.0.113.7", "203.0.113.7"),
+    (2, "198.51.100.1, 203.0.113.7, 10.0.0.2", "203.0.113.7"),
+    (2, "203.0.113.7", "10.0.0.1"),
+])
+def test_client_ip_respects_trusted_proxy_count(
+        rf, settings, hops, forwarded, expected
+):
+    settings.TRUSTED_PROXY_COUNT = hops
+    request = rf.post(
+        "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded
+    )
+    assert ratelimit.get_client_ip(request) == expected
+
+
+@pytest.mark.django_db
+def test_registration_limit_is_per_client_behind_proxy(
+        client, tight_limits, settings
+):
+    settings.TRUSTED_PROXY_COUNT = 1
+
+    def register(i, address):
+        return client.post("/auth/registration/", {
+            "username": f"proxied_user_{i}",
+            "password1": "Very-Secret-1234",
+            "password2": "Very-Secret-1234",
+        }, REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=address).status_code
+
+    assert [register(i, "203.0.113.7") for i in range(3)][-1] == 429
+    assert register(3, "198.51.100.1") != 429, (
+        "Клиенты за одним прокси не должны делить одну корзину."
+    )
+    assert register(4, "198.51.100.1, 203.0.113.7") == 429, (
+        "Подделанные левые записи X-Forwarded-For не должны учитываться."
+    )
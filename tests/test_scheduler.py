@@ -0,0 +1,178 @@
+import os
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.scheduler import PublicationScheduler, acquire_lock
+from blog.signals import post_became_visible
+
+
+@pytest.fixture(autouse=True)
+def watermark_path(settings, tmp_path):
+    settings.PUBLICATION_WATERMARK_PATH = tmp_path / "watermark.json"
+    return settings.PUBLICATION_WATERMARK_PATH
+
+
+@pytest.fixture
+def visible_events():
+    events = []
+
+    def receiver(sender, post, **kwargs):
+        events.append(post.id)
+
+    post_became_visible.connect(receiver)
+    yield events
+    post_became_visible.disconnect(receiver)
+
+
+@pytest.mark.django_db
+def test_scheduler_dispatches_in_pub_date_order(
+        mixer, user, published_category, visible_events
+):
+    now = timezone.now()
+    later, sooner, hidden = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=(now + timedelta(minutes=m) for m in (10, 5, 1)),
+        is_published=(value for value in (True, True, False)),
+    )
+    assert not visible_events, "Отложенные посты ещё не видны."
+
+    scheduler = PublicationScheduler(since=now, batch_size=1)
+    scheduler.load()
+    assert scheduler.next_due() == sooner.pub_date
+
+    assert scheduler.dispatch_due(now + timedelta(minutes=1)) == []
+    assert scheduler.dispatch_due(now + timedelta(minutes=6)) == [sooner.id]
+    assert scheduler.next_due() == later.pub_date, (
+        "После опустошения кучи должна подгружаться следующая пачка."
+    )
+    assert scheduler.dispatch_due(now + timedelta(minutes=11)) == [later.id]
+    assert visible_events == [sooner.id, later.id]
+
+
+@pytest.mark.django_db
+def test_visible_post_is_announced_on_save(
+        mixer, user, published_category, visible_events
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    assert visible_events == [post.id]
+
+    post.title = "Правка"
+    post.save()
+    assert visible_events == [post.id], (
+        "Правка уже видимого поста не должна повторять событие."
+    )
+    post.is_published = False
+    post.save()
+    post.is_published = True
+    post.save()
+    assert visible_events == [post.id, post.id]
+
+
+@pytest.mark.django_db
+def test_scheduler_keeps_posts_sharing_boundary_pub_date(
+        mixer, user, published_category, visible_events
+):
+    now = timezone.now()
+    pub_date = now + timedelta(minutes=1)
+    first, second = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=pub_date,
+    )
+
+    scheduler = PublicationScheduler(since=now, batch_size=1)
+    scheduler.load()
+    assert scheduler.dispatch_due(pub_date) == [first.id]
+    assert scheduler.dispatch_due(pub_date) == [second.id]
+
+
+@pytest.mark.django_db
+def test_dispatch_publications_once(
+        mixer, user, published_category, visible_events
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    Post.objects.filter(id=post.id).update(
+        pub_date=timezone.now() - timedelta(seconds=5)
+    )
+    call_command("dispatch_publications", "--once")
+    assert visible_events == [post.id]
+
+
+def make_due_post(mixer, user, category, seconds_ago):
+    post = mixer.blend(
+        "blog.Post", author=user, category=category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    Post.objects.filter(id=post.id).update(
+        pub_date=timezone.now() - timedelta(seconds=seconds_ago)
+    )
+    return post
+
+
+@pytest.mark.django_db
+def test_dispatch_publications_persists_watermark(
+        mixer, user, published_category, visible_events
+):
+    first = make_due_post(mixer, user, published_category, 5)
+    call_command("dispatch_publications", "--once")
+    call_command("dispatch_publications", "--once")
+    assert visible_events == [first.id], "Повторный запуск не дублирует."
+
+    # Пост наступил раньше окна --catch-up, но после сохранённой
+    # отметки (запуск из cron опоздал) — он не теряется.
+    late = make_due_post(mixer, user, published_category, 1)
+    call_command("dispatch_publications", "--once", "--catch-up=0")
+    assert visible_events == [first.id, late.id]
+
+
+@pytest.mark.django_db
+def test_overlapping_dispatch_runs_are_skipped(
+        mixer, user, published_category, visible_events, watermark_path
+):
+    make_due_post(mixer, user, published_category, 5)
+    lock = acquire_lock(watermark_path)
+    try:
+        call_command("dispatch_publications", "--once")
+    finally:
+        os.close(lock)
+    assert not visible_events
+
+
+@pytest.mark.django_db
+def test_post_visible_on_save_is_not_dispatched_again(
+        mixer, user, published_category, visible_events
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now(),
+    )
+    assert visible_events == [post.id]
+
+    call_command("dispatch_publications", "--once")
+    assert visible_events == [post.id], (
+        "Пост, объявленный при сохранении, не рассылается повторно."
+    )
+
+
+@pytest.mark.django_db
+def test_post_hidden_after_load_is_not_dispatched(
+        mixer, user, published_category, visible_events
+):
+    now = timezone.now()
+    shown, hidden = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=now + timedelta(minutes=1),
+    )
+    scheduler = PublicationScheduler(since=now)
+    scheduler.load()
+    Post.objects.filter(id=hidden.id).update(is_published=False)
+
+    assert scheduler.dispatch_due(now + timedelta(minutes=2)) == [shown.id]
+    assert visible_events == [shown.id]
+    assert Post.objects.get(id=shown.id).is_announced
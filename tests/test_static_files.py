@@ -0,0 +1,57 @@
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import override_settings
+
+
+@pytest.fixture
+def collected_static(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path, STATIC_SERVE=True):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        staticfiles_storage.load_manifest()
+        yield tmp_path
+
+
+def test_collectstatic_writes_hashed_and_compressed_files(collected_static):
+    hashed_css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    assert hashed_css != "css/bootstrap.min.css", (
+        "Имя собранного файла должно содержать хеш содержимого."
+    )
+    assert (collected_static / hashed_css).is_file()
+    assert (collected_static / f"{hashed_css}.gz").is_file()
+
+
+@pytest.mark.django_db
+def test_hashed_static_is_served_compressed_with_long_cache(
+        client, collected_static
+):
+    hashed_css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    response = client.get(
+        f"/static/{hashed_css}", HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert "immutable" in response["Cache-Control"]
+    assert "Accept-Encoding" in response["Vary"]
+
+    content = client.get("/").content.decode("utf-8")
+    assert f"/static/{hashed_css}" in content, (
+        "Bootstrap должен подключаться из локальной статики по хешированному"
+        " имени."
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "x-notgzip", ""])
+def test_static_respects_accept_encoding_weights(
+        client, collected_static, accept_encoding
+):
+    hashed_css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    response = client.get(
+        f"/static/{hashed_css}", HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+    assert response.status_code == 200
+    assert not response.has_header("Content-Encoding"), (
+        "Отклонённая (q=0) или не названная кодировка не должна выбираться."
+    )
+    assert "immutable" in response["Cache-Control"]
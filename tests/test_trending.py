@@ -0,0 +1,83 @@
+import math
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import trending
+from blog.models import Comment, PostScore
+
+
+def test_scores_decay_with_half_life(settings):
+    settings.TRENDING_HALF_LIFE = timedelta(hours=1)
+    now = timezone.now()
+    fresh = trending.event_score(now)
+    hour_old = trending.event_score(now - timedelta(hours=1))
+    assert fresh - hour_old == pytest.approx(1)
+    assert trending.add_scores(hour_old, hour_old) == pytest.approx(fresh)
+    assert trending.add_scores(None, fresh) == fresh
+    assert math.isfinite(trending.add_scores(fresh, fresh - 2000))
+
+
+@pytest.mark.django_db
+def test_trending_ranks_by_decayed_comment_activity(
+        mixer, user, published_category, client
+):
+    old_hot, fresh, quiet = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    for _ in range(3):
+        mixer.blend("blog.Comment", post=old_hot, author=user)
+    Comment.objects.filter(post=old_hot).update(
+        created_at=timezone.now() - timedelta(days=3)
+    )
+    mixer.blend("blog.Comment", post=fresh, author=user)
+
+    call_command("update_trending")
+
+    response = client.get("/trending/")
+    assert [post.id for post in response.context["page_obj"]] == [
+        fresh.id, old_hot.id
+    ]
+
+    for _ in range(30):
+        mixer.blend("blog.Comment", post=old_hot, author=user)
+    with CaptureQueriesContext(connection) as ctx:
+        call_command("update_trending")
+    scored_comments = [
+        q["sql"] for q in ctx.captured_queries
+        if 'FROM "blog_comment"' in q["sql"]
+    ]
+    assert len(scored_comments) == 1
+    response = client.get("/trending/")
+    assert response.context["page_obj"][0].id == old_hot.id
+    assert PostScore.objects.get(post=old_hot).last_comment_id == (
+        Comment.objects.latest("id").id
+    )
+
+
+@pytest.mark.django_db
+def test_trending_page_reads_scores_before_comments(
+        mixer, user, published_category, client
+):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    for post in posts:
+        mixer.blend("blog.Comment", post=post, author=user)
+    call_command("update_trending")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/trending/")
+    assert [post.comment_count for post in response.context["page_obj"]] == [
+        1, 1, 1
+    ]
+    page_query = next(
+        q["sql"] for q in ctx.captured_queries
+        if q["sql"].startswith('SELECT "blog_postscore"')
+    )
+    assert "LIMIT" in page_query
+    assert "blog_comment" not in page_query and "GROUP BY" not in page_query
@@ -0,0 +1,73 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from blog.models import Post
+
+
+def image_upload(size, name="photo.png"):
+    img_io = BytesIO()
+    Image.new("1", size).save(img_io, format="PNG")
+    return SimpleUploadedFile(name, img_io.getvalue(), "image/png")
+
+
+@pytest.fixture
+def post_data(published_category):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+    }
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_PIXELS=100 * 100)
+def test_image_with_too_many_pixels_is_rejected(
+        user_client, post_data, tmp_path
+):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        response = user_client.post(
+            "/posts/create/", {**post_data, "image": image_upload((101, 100))}
+        )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.exists()
+
+    with override_settings(MEDIA_ROOT=tmp_path):
+        user_client.post(
+            "/posts/create/", {**post_data, "image": image_upload((100, 100))}
+        )
+    assert Post.objects.count() == 1
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_SIZE=1024)
+def test_oversized_upload_is_rejected(user_client, post_data):
+    upload = SimpleUploadedFile("big.png", b"\0" * 4096, "image/png")
+    response = user_client.post(
+        "/posts/create/", {**post_data, "image": upload}
+    )
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_SIZE=1024)
+def test_post_upload_handler_is_scoped_and_keeps_csrf(user, post_data):
+    assert not [
+        handler for handler in settings.FILE_UPLOAD_HANDLERS
+        if handler.startswith("blog.")
+    ], "Ограничения изображений не должны действовать на все загрузки."
+
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    upload = SimpleUploadedFile("big.png", b"\0" * 4096, "image/png")
+    response = client.post("/posts/create/", {**post_data, "image": upload})
+    assert response.status_code == 403
+    assert not Post.objects.exists()
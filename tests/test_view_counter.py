@@ -0,0 +1,89 @@
+import pytest
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import counters
+from blog.counters import view_counter
+from blog.models import PostScore, PostViewCount
+
+
+@pytest.fixture
+def counter(settings):
+    settings.VIEW_COUNTER_FLUSH_INTERVAL = 60 * 60
+    settings.VIEW_COUNTER_MAX_PENDING = 1000
+    view_counter.pending.clear()
+    yield view_counter
+    view_counter.pending.clear()
+    view_counter.pending_since = None
+
+
+@pytest.mark.django_db
+def test_views_are_counted_in_memory_and_displayed(
+        client, post_with_published_location, counter
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    for _ in range(3):
+        client.get(url)
+
+    assert not PostViewCount.objects.exists(), (
+        "Просмотры должны копиться в памяти до сброса."
+    )
+    assert "Просмотров: 4" in client.get(url).content.decode("utf-8")
+
+    counter.flush()
+    assert PostViewCount.objects.get(
+        post=post_with_published_location
+    ).views == 4
+    assert "Просмотров: 5" in client.get(url).content.decode("utf-8")
+    assert PostScore.objects.filter(post=post_with_published_location).exists()
+
+
+@pytest.mark.django_db
+def test_flush_is_batched(many_posts_with_published_locations, counter):
+    for post in many_posts_with_published_locations:
+        counter.record(post.id)
+        counter.record(post.id)
+    with CaptureQueriesContext(connection) as ctx:
+        counter.flush()
+    queries = [
+        query for query in ctx.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+    assert len(queries) <= 6, (
+        "Сброс счётчиков должен выполняться пакетными запросами."
+    )
+    assert set(PostViewCount.objects.values_list("views", flat=True)) == {2}
+
+
+@pytest.mark.django_db
+def test_flush_is_triggered_by_limits(
+        settings, post_with_published_location, counter
+):
+    settings.VIEW_COUNTER_FLUSH_INTERVAL = 0
+    counter.record(post_with_published_location.id)
+    assert PostViewCount.objects.get(
+        post=post_with_published_location
+    ).views == 1
+
+
+@pytest.mark.django_db
+def test_failed_flush_does_not_break_page_view(
+        settings, client, post_with_published_location, counter, monkeypatch
+):
+    settings.VIEW_COUNTER_FLUSH_INTERVAL = 0
+    url = f"/posts/{post_with_published_location.id}/"
+
+    def fail(view_counts):
+        raise DatabaseError("database is locked")
+
+    monkeypatch.setattr(counters, "save_views", fail)
+    assert client.get(url).status_code == 200
+    assert counter.get_pending(post_with_published_location.id) == 1, (
+        "Несохранённые просмотры должны дождаться следующего сброса."
+    )
+
+    monkeypatch.undo()
+    client.get(url)
+    assert PostViewCount.objects.get(
+        post=post_with_published_location
+    ).views == 2